@@ -19,11 +19,70 @@ from hh_bot.scraper.resume_parser import fetch_resume_content, ResumeInfo
 from hh_bot.scraper.search import search_vacancies
 from hh_bot.scraper.vacancy import fetch_vacancy_details
 from hh_bot.scraper.apply import apply_to_vacancy
+from hh_bot.ai_generator.cache import close_letter_cache
+from hh_bot.ai_generator.client import aclose_client
 
 # Максимальное логирование
 setup_logging("DEBUG")
 log = get_logger(__name__)
 
+# Сколько вакансий открывать параллельно при поиске подходящей
+PREFETCH_PAGES = 4
+
+
+def _skip_reason(details, cfg):
+    """Причина пропуска вакансии или None, если она подходит."""
+    if details.already_applied:
+        return "уже откликались"
+    if details.has_test and cfg.filters.skip_with_tests:
+        return "есть тестовое"
+    if details.is_external and cfg.filters.skip_direct_vacancies:
+        return "внешняя ссылка"
+    return None
+
+
+async def find_target_vacancy(context, page, cards, cfg):
+    """Открывает карточки пачками по PREFETCH_PAGES вкладок и возвращает
+    (вкладка, карточка, детали) первой подходящей вакансии или None.
+
+    Лишние вкладки закрываются, вкладка с найденной вакансией остаётся открытой.
+    """
+    pages = [page] + [await context.new_page() for _ in range(min(PREFETCH_PAGES, len(cards)) - 1)]
+    found = None
+    try:
+        for start in range(0, len(cards), len(pages)):
+            tasks = {
+                asyncio.create_task(fetch_vacancy_details(p, card.url, card.vacancy_id)): (p, card)
+                for p, card in zip(pages, cards[start:start + len(pages)])
+            }
+            pending = set(tasks)
+            while pending and found is None:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    tab, card = tasks[task]
+                    print(f"Проверяю: {card.title} - {card.employer}")
+                    if task.exception() is not None:
+                        print(f"  -> Пропуск: ошибка загрузки ({task.exception()})")
+                        continue
+                    details = task.result()
+                    reason = _skip_reason(details, cfg)
+                    if reason:
+                        print(f"  -> Пропуск: {reason}")
+                        continue
+                    if found is None:
+                        print(f"  -> Подходит!")
+                        found = (tab, card, details)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+            if found:
+                return found
+        return None
+    finally:
+        for p in pages:
+            if p is not page and (found is None or p is not found[0]):
+                await p.close()
+
 
 async def debug_single_apply():
     """Отладка одного отклика."""
@@ -74,36 +133,16 @@ async def debug_single_apply():
             print("❌ Вакансии не найдены")
             return
         
-        # Берем первую подходящую
-        target_card = None
-        for card in cards:
-            print(f"Проверяю: {card.title} - {card.employer}")
-            
-            # Открываем для проверки
-            details = await fetch_vacancy_details(page, card.url, card.vacancy_id)
-            
-            # Пропускаем если уже откликались, есть тест или внешняя ссылка
-            if details.already_applied:
-                print(f"  -> Пропуск: уже откликались")
-                continue
-            if details.has_test and cfg.filters.skip_with_tests:
-                print(f"  -> Пропуск: есть тестовое")
-                continue
-            if details.is_external and cfg.filters.skip_direct_vacancies:
-                print(f"  -> Пропуск: внешняя ссылка")
-                continue
-            
-            print(f"  -> Подходит!")
-            target_card = card
-            break
-        
-        if not target_card:
+        # Берем первую подходящую (несколько вкладок параллельно)
+        target = await find_target_vacancy(context, page, cards, cfg)
+        if not target:
             print("\n❌ Нет подходящих вакансий для теста")
             return
         
-        # 4. Открываем выбранную вакансию
+        # 4. Выбранная вакансия уже открыта в своей вкладке
+        page, target_card, details = target
+        await page.bring_to_front()
         print(f"\n[4/5] Открываю вакансию: {target_card.title}")
-        details = await fetch_vacancy_details(page, target_card.url, target_card.vacancy_id)
         print(f"✅ Вакансия открыта")
         print(f"   ID: {details.vacancy_id}")
         print(f"   Название: {details.title}")
@@ -138,5 +177,13 @@ async def debug_single_apply():
         input("\nНажми Enter для закрытия...")
 
 
+async def main():
+    try:
+        await debug_single_apply()
+    finally:
+        await aclose_client()
+        close_letter_cache()
+
+
 if __name__ == "__main__":
-    asyncio.run(debug_single_apply())
+    asyncio.run(main())
@@ -1,7 +1,13 @@
 """AI Cover Letter Generator using OpenRouter API."""
 from __future__ import annotations
 
-from hh_bot.ai_generator.generator import generate_ai_cover_letter
+from hh_bot.ai_generator.client import aclose_client
+from hh_bot.ai_generator.generator import generate_ai_cover_letter, generate_ai_cover_letters_batch
 from hh_bot.ai_generator.models import AIGeneratorConfig
 
-__all__ = ["generate_ai_cover_letter", "AIGeneratorConfig"]
+__all__ = [
+    "generate_ai_cover_letter",
+    "generate_ai_cover_letters_batch",
+    "AIGeneratorConfig",
+    "aclose_client",
+]
@@ -0,0 +1,274 @@
+"""Persistent cache for generated cover letters.
+
+Two tiers:
+- exact: blake2b hash of the resume/vacancy inputs -> letter text;
+- semantic: embedding of the vacancy description, compared only against
+  letters written for the same resume, employer and position (reposted
+  vacancies), so a letter is never reused for a different company.
+
+The same database also keeps raw provider responses keyed on the request
+body, so identical completion requests are not repeated across runs.
+
+The semantic tier lives in ``semantic_cache`` and is enabled only if
+``sentence-transformers`` is installed.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from hh_bot.ai_generator.semantic_cache import EMBEDDING_MODEL, SemanticIndex
+from hh_bot.scraper.resume_parser import ResumeInfo
+from hh_bot.scraper.vacancy import VacancyDetails
+from hh_bot.utils.logger import get_logger
+
+log = get_logger(__name__)
+
+DEFAULT_CACHE_PATH = "./data/letter_cache.db"
+DEFAULT_TTL_S = 30 * 24 * 3600  # 30 дней
+DEFAULT_MAX_ENTRIES = 2000
+MEMORY_ENTRIES = 256  # In-process LRU in front of SQLite
+
+
+def _hash(*parts: Any) -> str:
+    raw = json.dumps(parts, ensure_ascii=False, sort_keys=True)
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def make_request_key(url: str, payload: dict) -> str:
+    """Key for a provider response: endpoint + full request body."""
+    return _hash(url, payload)
+
+
+def _resume_fingerprint(resume: ResumeInfo) -> tuple:
+    return (resume.title, resume.skills, resume.about)
+
+
+def make_key(
+    resume: ResumeInfo,
+    vacancy: VacancyDetails,
+    vacancy_description: Optional[str],
+    telegram: Optional[str] = None,
+    author_name: Optional[str] = None,
+    model: str = "",
+    temperature: float = 0.0,
+    custom_prompt: str = "",
+) -> str:
+    """Exact-match key for a (resume, vacancy) pair and generation settings."""
+    return _hash(
+        _resume_fingerprint(resume),
+        vacancy.vacancy_id,
+        vacancy.title,
+        vacancy.employer,
+        (vacancy_description or "")[:600],
+        telegram or "",
+        author_name or "",
+        str(model),
+        temperature,
+        custom_prompt or "",
+    )
+
+
+def make_scope(
+    resume: ResumeInfo,
+    vacancy: VacancyDetails,
+    telegram: Optional[str] = None,
+    author_name: Optional[str] = None,
+    model: str = "",
+    temperature: float = 0.0,
+    custom_prompt: str = "",
+) -> str:
+    """Group of letters the semantic tier may reuse from.
+
+    Includes the embedding model, so vectors from another model are never
+    compared against new ones, and the generation settings of ``make_key``,
+    so a changed prompt or model does not get old letters back.
+    """
+    return _hash(
+        EMBEDDING_MODEL,
+        _resume_fingerprint(resume),
+        vacancy.title,
+        vacancy.employer,
+        telegram or "",
+        author_name or "",
+        str(model),
+        temperature,
+        custom_prompt or "",
+    )
+
+
+class LetterCache:
+    def __init__(
+        self,
+        db_path: str = DEFAULT_CACHE_PATH,
+        ttl_s: float = DEFAULT_TTL_S,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ) -> None:
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl_s = ttl_s
+        self.max_entries = max_entries
+        self._memory: OrderedDict[str, Tuple[str, float]] = OrderedDict()
+        # last_used of memory hits, written to SQLite before eviction and on close
+        self._touched: Dict[str, float] = {}
+        self.hits = 0
+        self.misses = 0
+        self._conn = sqlite3.connect(str(self.db_path))
+        self._init_schema()
+        self._semantic = SemanticIndex(self._conn)
+
+    def _init_schema(self) -> None:
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS letters (
+                key          TEXT PRIMARY KEY,
+                body         TEXT,
+                created      REAL,
+                last_used    REAL
+            )
+        """)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key          TEXT PRIMARY KEY,
+                body         BLOB,
+                expires      REAL
+            )
+        """)
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[str]:
+        """Exact lookup. Returns None on miss or expired entry."""
+        hit = self._memory.get(key)
+        if hit is not None:
+            now = time.time()
+            if now - hit[1] <= self.ttl_s:
+                self._memory.move_to_end(key)
+                self._touched[key] = now
+                return hit[0]
+        row = self._conn.execute(
+            "SELECT body, created FROM letters WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        body, created = row
+        now = time.time()
+        if now - created > self.ttl_s:
+            return None
+        self._conn.execute("UPDATE letters SET last_used = ? WHERE key = ?", (now, key))
+        self._conn.commit()
+        self._remember(key, body, created)
+        return body
+
+    def record(self, hit: bool) -> None:
+        """Count a letter lookup (exact or semantic) for the hit-rate log."""
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def _remember(self, key: str, body: str, created: float) -> None:
+        self._memory[key] = (body, created)
+        self._memory.move_to_end(key)
+        if len(self._memory) > MEMORY_ENTRIES:
+            self._memory.popitem(last=False)
+
+    def get_similar(self, scope: str, embedding: Any) -> Optional[str]:
+        """Semantic lookup among letters of the same scope.
+
+        ``embedding`` is ``semantic_cache.embed`` of the vacancy description.
+        """
+        key = self._semantic.search(scope, embedding)
+        return self.get(key) if key is not None else None
+
+    def put(
+        self,
+        key: str,
+        body: str,
+        scope: Optional[str] = None,
+        embedding: Any = None,
+    ) -> None:
+        now = time.time()
+        self._conn.execute(
+            """
+            INSERT OR REPLACE INTO letters (key, body, created, last_used)
+            VALUES (?, ?, ?, ?)
+            """,
+            (key, body, now, now),
+        )
+        self._remember(key, body, now)
+        if scope and embedding is not None:
+            self._semantic.add(key, scope, embedding)
+        self._evict(now)
+        self._conn.commit()
+
+    def get_response(self, key: str) -> Optional[bytes]:
+        """Cached provider response body, or None on miss/expired entry."""
+        row = self._conn.execute(
+            "SELECT body FROM responses WHERE key = ? AND expires > ?", (key, time.time())
+        ).fetchone()
+        return row[0] if row else None
+
+    def put_response(self, key: str, body: bytes, ttl_s: float) -> None:
+        now = time.time()
+        self._conn.execute(
+            "INSERT OR REPLACE INTO responses (key, body, expires) VALUES (?, ?, ?)",
+            (key, body, now + ttl_s),
+        )
+        self._conn.execute("DELETE FROM responses WHERE expires <= ?", (now,))
+        self._conn.commit()
+
+    def _flush_touched(self) -> None:
+        """Write last_used of memory hits (the caller commits)."""
+        if self._touched:
+            self._conn.executemany(
+                "UPDATE letters SET last_used = ? WHERE key = ?",
+                [(used, key) for key, used in self._touched.items()],
+            )
+            self._touched.clear()
+
+    def _evict(self, now: float) -> None:
+        """Drop expired entries, then least recently used ones over the limit."""
+        self._flush_touched()
+        # Expired letters are also refused by the memory tier itself
+        self._conn.execute("DELETE FROM letters WHERE created < ?", (now - self.ttl_s,))
+        evicted = self._conn.execute(
+            "SELECT key FROM letters ORDER BY last_used DESC LIMIT -1 OFFSET ?",
+            (self.max_entries,),
+        ).fetchall()
+        if evicted:
+            self._conn.executemany("DELETE FROM letters WHERE key = ?", evicted)
+            for (key,) in evicted:
+                self._memory.pop(key, None)
+        self._semantic.prune()
+
+    def close(self) -> None:
+        self._flush_touched()
+        self._conn.commit()
+        self._conn.close()
+
+
+_cache: Optional[LetterCache] = None
+
+
+def get_letter_cache() -> LetterCache:
+    global _cache
+    if _cache is None:
+        _cache = LetterCache()
+    return _cache
+
+
+def close_letter_cache() -> None:
+    """Close the process-wide cache, if it was opened, saving last_used of memory hits."""
+    global _cache
+    if _cache is not None:
+        _cache.close()
+        _cache = None
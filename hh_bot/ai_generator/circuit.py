@@ -0,0 +1,82 @@
+"""Circuit breaker for AI providers.
+
+After several consecutive failures (5xx, 429, timeouts) the provider is
+skipped for a while, so an outage costs one timeout instead of one per
+vacancy. After the break a single probe request decides whether to close
+the circuit again.
+"""
+from __future__ import annotations
+
+import time
+from enum import Enum
+
+from hh_bot.utils.logger import get_logger
+
+log = get_logger(__name__)
+
+
+class CircuitState(str, Enum):
+    CLOSED = "closed"  # Запросы идут как обычно
+    OPEN = "open"  # Провайдер пропускается
+    HALF_OPEN = "half_open"  # Пробный запрос после паузы
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        break_duration_s: float = 60.0,
+        half_open_probes: int = 1,
+    ) -> None:
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.break_duration_s = break_duration_s
+        self.half_open_probes = half_open_probes
+        self.state = CircuitState.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+
+    def can_execute(self) -> bool:
+        """Whether a request may be sent now."""
+        if self.state == CircuitState.OPEN:
+            if time.monotonic() - self._opened_at < self.break_duration_s:
+                return False
+            self.state = CircuitState.HALF_OPEN
+            self._probes = 0
+            log.info("Circuit half-open, probing", provider=self.name)
+        if self.state == CircuitState.HALF_OPEN:
+            if self._probes >= self.half_open_probes:
+                return False
+            self._probes += 1
+        return True
+
+    def release(self) -> None:
+        """Give back a half-open probe slot for a request that ended without a verdict."""
+        if self.state == CircuitState.HALF_OPEN and self._probes > 0:
+            self._probes -= 1
+
+    def on_success(self) -> None:
+        if self.state != CircuitState.CLOSED:
+            log.info("Circuit closed", provider=self.name)
+        self.state = CircuitState.CLOSED
+        self._failures = 0
+
+    def on_failure(self) -> None:
+        self._failures += 1
+        if self.state == CircuitState.HALF_OPEN or self._failures >= self.failure_threshold:
+            if self.state != CircuitState.OPEN:
+                log.warning(
+                    "Circuit opened",
+                    provider=self.name,
+                    failures=self._failures,
+                    break_s=self.break_duration_s,
+                )
+            self.state = CircuitState.OPEN
+            self._opened_at = time.monotonic()
+
+
+def is_breaker_failure(status: int) -> bool:
+    """Statuses that mean the provider is unhealthy (not a bad request)."""
+    return status == 429 or status >= 500
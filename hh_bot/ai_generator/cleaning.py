@@ -0,0 +1,140 @@
+"""Text normalization shared by the OpenRouter and Groq generators."""
+from __future__ import annotations
+
+import functools
+import hashlib
+import re
+from typing import Optional
+
+from hh_bot.utils.logger import get_logger
+
+log = get_logger(__name__)
+
+# Markdown fences (with an optional language tag) the model sometimes adds
+ARTIFACT_RE = re.compile(r"```(?:text)?")
+# Raw pattern too, so generator.py can fold it into its one-pass junk filter
+SUBJECT_LINE = r"^[^\S\n]*(?:subject|re):.*\n?"
+SUBJECT_LINE_RE = re.compile(SUBJECT_LINE, re.IGNORECASE | re.MULTILINE)
+# Contact lines and standalone @usernames the model adds despite the prompt
+CONTACT_LINE = (
+    r"^[^\S\n]*(?:telegram:|с уважением|tel:).*\n?"
+    r"|^[^\S\n]*@[^\n]{0,28}?[^\S\n]*$\n?"
+)
+CONTACT_LINE_RE = re.compile(CONTACT_LINE, re.IGNORECASE | re.MULTILINE)
+# Paragraphs that belong to the signature block and survive truncation
+CONTACT_RE = re.compile(r"telegram|с уважением|телеграм|@|tel:|phone:", re.IGNORECASE)
+# Sentence end followed by a space (where a paragraph may be cut)
+SENT_BREAK_RE = re.compile(r"[.!?] ")
+GREETING_RE = re.compile(r"добрый|здравствуйте|уважаемый", re.IGNORECASE)
+
+
+@functools.lru_cache(maxsize=8)
+def system_message(prompt: str) -> dict:
+    """System message with the prompt normalized once per distinct text.
+
+    Providers reuse the prompt-prefix cache only for byte-identical
+    prefixes, so stray whitespace in a custom prompt must not vary. The
+    hash is logged once per prompt so cache invalidations are visible.
+    """
+    content = prompt.strip()
+    digest = hashlib.blake2b(content.encode("utf-8"), digest_size=4).hexdigest()
+    log.debug("System prompt", hash=digest, chars=len(content))
+    return {"role": "system", "content": content}
+
+
+def clip(text: str, max_chars: int) -> str:
+    """Cut text to max_chars on a word boundary, marking the cut with ' …'."""
+    if len(text) <= max_chars:
+        return text
+    cut = text[:max_chars]
+    space = cut.rfind(" ")
+    if space > max_chars * 0.8:
+        cut = cut[:space]
+    return cut.rstrip() + " …"
+
+
+def ensure_greeting(text: str) -> str:
+    """Prepend "Добрый день!" unless the letter already opens with a greeting."""
+    if GREETING_RE.match(text):
+        return text
+    return f"Добрый день!\n\n{text}"
+
+
+def clean_cover_letter(text: str) -> str:
+    """Strip code fences and "Subject:"/"Re:" lines, make sure there is a greeting."""
+    text = ARTIFACT_RE.sub("", text)
+    text = SUBJECT_LINE_RE.sub("", text).strip()
+    return ensure_greeting(text)
+
+
+def append_signature(text: str, telegram: Optional[str], name: Optional[str]) -> str:
+    """Add Telegram contact and "С уважением" signature at the end."""
+    if telegram:
+        text += f"\n\nTelegram: @{telegram}"
+    
+    if name:
+        text += f"\n\nС уважением,\n{name}"
+    
+    return text
+
+
+def ensure_contacts(text: str, telegram: Optional[str], name: Optional[str]) -> str:
+    """Replace any contacts the model wrote with ours at the end of the letter."""
+    # Contact lines and standalone @usernames
+    text = CONTACT_LINE_RE.sub("", text).strip()
+    return append_signature(text, telegram, name)
+
+
+def smart_truncate(text: str, max_chars: int = 500) -> str:
+    """Smart truncate that keeps contacts (last 2 paragraphs) visible.
+    
+    Priority: keep Telegram and signature, truncate body if needed.
+    """
+    if len(text) <= max_chars:
+        return text
+    
+    paragraphs = [p.strip() for p in text.split('\n\n') if p.strip()]
+    
+    # Contact block: the last 2 paragraphs plus any contact paragraphs right before them
+    contact_start = max(len(paragraphs) - 2, 0)
+    while contact_start > 0 and CONTACT_RE.search(paragraphs[contact_start - 1]):
+        contact_start -= 1
+    body_paragraphs = paragraphs[:contact_start]
+    contacts_text = '\n\n'.join(paragraphs[contact_start:])
+    
+    # Available space for body
+    available_for_body = max_chars - len(contacts_text) - 10  # 10 for padding
+    
+    body_parts = []
+    if available_for_body < 100:
+        # Not enough space, keep only greeting + minimal body + contacts
+        if body_paragraphs:
+            body_parts.append(clip(body_paragraphs[0], 100))
+    else:
+        # Whole paragraphs while they fit, then a partial one ending on a sentence
+        current_len = 0
+        for p in body_paragraphs:
+            if current_len + len(p) + 2 <= available_for_body:  # +2 for \n\n
+                body_parts.append(p)
+                current_len += len(p) + 2
+                continue
+            remaining = available_for_body - current_len
+            if remaining > 50:
+                # Last sentence end that fits, in one scan
+                last = None
+                for last in SENT_BREAK_RE.finditer(p, 0, remaining):
+                    pass
+                if last is not None and last.start() > remaining * 0.5:
+                    body_parts.append(p[:last.start() + 1])
+            break
+    
+    body_parts.append(contacts_text)
+    result = '\n\n'.join(filter(None, body_parts))
+    
+    log.warning(
+        "Letter SMART truncated",
+        before=len(text),
+        after=len(result),
+        contact_paragraphs=len(paragraphs) - contact_start,
+    )
+    return result.strip()
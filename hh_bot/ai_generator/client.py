@@ -0,0 +1,270 @@
+"""Shared HTTP client for AI provider requests."""
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+import json
+import random
+import re
+from typing import Any, Optional, Tuple, Union
+
+try:
+    import httpx
+    HAS_HTTPX = True
+except ImportError:
+    HAS_HTTPX = False
+    httpx = None  # type: ignore
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+    orjson = None  # type: ignore
+
+from hh_bot.ai_generator.cache import get_letter_cache, make_request_key
+from hh_bot.utils.logger import get_logger
+
+log = get_logger(__name__)
+
+# HTTP/2 needs the optional h2 package (pip install "httpx[http2]")
+HAS_HTTP2 = importlib.util.find_spec("h2") is not None
+# httpx decodes br only with brotli installed (pip install "httpx[brotli]")
+HAS_BROTLI = any(importlib.util.find_spec(m) is not None for m in ("brotli", "brotlicffi"))
+ACCEPT_ENCODING = "gzip, br" if HAS_BROTLI else "gzip"
+USER_AGENT = "hh-bot/1.0"
+
+# Responses to more random requests are not worth replaying. Groq asks for
+# 0.3; OpenRouter uses the configured temperature (0.7 by default), so its
+# responses are only cached once that is lowered.
+MAX_CACHEABLE_TEMPERATURE = 0.3
+
+# Transient failures are retried with exponential backoff + jitter;
+# other 4xx are returned to the caller right away
+RETRY_STATUSES = frozenset({408, 429, 500, 502, 503, 504})
+RETRY_ATTEMPTS = 4
+RETRY_BASE_S = 0.5
+RETRY_CAP_S = 8.0
+RETRY_AFTER_MAX_S = 30.0
+
+_client: Optional["httpx.AsyncClient"] = None
+_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _encode(payload: dict) -> bytes:
+    """Serialize a request body (orjson if installed)."""
+    if HAS_ORJSON:
+        return orjson.dumps(payload)
+    return json.dumps(payload, ensure_ascii=False).encode("utf-8")
+
+
+def parse_json(raw: Union[bytes, str]) -> Any:
+    """Parse a response body (orjson if installed)."""
+    if HAS_ORJSON:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def get_client() -> "httpx.AsyncClient":
+    """Return the process-wide client, creating it on first use.
+
+    Keeps TCP/TLS connections to OpenRouter/Groq alive between letters.
+    The client is bound to the event loop it was created in, so a new one
+    is created when called from another loop (e.g. a second asyncio.run()).
+    """
+    global _client, _client_loop
+    loop = asyncio.get_running_loop()
+    if _client is None or _client.is_closed or _client_loop is not loop:
+        _client = httpx.AsyncClient(
+            http2=HAS_HTTP2,
+            headers={"Accept-Encoding": ACCEPT_ENCODING, "User-Agent": USER_AGENT},
+            timeout=httpx.Timeout(30.0, connect=5.0, write=10.0, pool=5.0),
+            limits=httpx.Limits(
+                max_keepalive_connections=20,
+                max_connections=100,
+                keepalive_expiry=15.0,
+            ),
+        )
+        _client_loop = loop
+        log.debug("Created shared AI HTTP client", http2=HAS_HTTP2, encoding=ACCEPT_ENCODING)
+    return _client
+
+
+def _retry_delay(attempt: int, retry_after: Optional[str] = None) -> float:
+    """Backoff before the next attempt; a Retry-After in seconds wins."""
+    if retry_after:
+        try:
+            return min(max(float(retry_after), 0.0), RETRY_AFTER_MAX_S)
+        except ValueError:
+            pass  # HTTP-date form, use our own backoff
+    return min(RETRY_CAP_S, RETRY_BASE_S * 2 ** attempt) * random.uniform(0.5, 1.5)
+
+
+async def _post_with_retry(
+    url: str,
+    headers: dict,
+    payload: dict,
+    max_attempts: int = RETRY_ATTEMPTS,
+) -> "httpx.Response":
+    client = get_client()
+    content = _encode(payload)
+    for attempt in range(max_attempts - 1):
+        try:
+            response = await client.post(url, headers=headers, content=content)
+        except (httpx.TimeoutException, httpx.NetworkError) as e:
+            delay = _retry_delay(attempt)
+            log.warning("Request failed, retrying", url=url, error=type(e).__name__, delay=round(delay, 2))
+        else:
+            if response.status_code not in RETRY_STATUSES:
+                return response
+            delay = _retry_delay(attempt, response.headers.get("retry-after"))
+            log.warning("Retryable status, backing off", url=url, status=response.status_code, delay=round(delay, 2))
+        await asyncio.sleep(delay)
+    # Last attempt: whatever happens goes to the caller
+    return await client.post(url, headers=headers, content=content)
+
+
+async def aclose_client() -> None:
+    """Close the shared client. Call before the event loop shuts down."""
+    global _client, _client_loop
+    if _client is not None and not _client.is_closed:
+        await _client.aclose()
+    _client = None
+    _client_loop = None
+
+
+async def post_cached(
+    url: str,
+    headers: dict,
+    payload: dict,
+    ttl_s: float = 0,
+    max_attempts: int = RETRY_ATTEMPTS,
+) -> "httpx.Response":
+    """POST a completion request, replaying a stored 200 response if any.
+
+    ``headers`` must include ``Content-Type: application/json``.
+    Completions are not cacheable by HTTP semantics, so the key is the full
+    request body. Disabled when ``ttl_s`` is 0 or the temperature is high.
+    """
+    if ttl_s <= 0 or payload.get("temperature", 1.0) > MAX_CACHEABLE_TEMPERATURE:
+        return await _post_with_retry(url, headers, payload, max_attempts)
+
+    cache = get_letter_cache()
+    key = make_request_key(url, payload)
+    body = cache.get_response(key)
+    if body is not None:
+        log.debug("HTTP cache hit", url=url, model=payload.get("model"))
+        return httpx.Response(200, content=body, request=httpx.Request("POST", url))
+
+    response = await _post_with_retry(url, headers, payload, max_attempts)
+    if response.status_code == 200:
+        cache.put_response(key, response.content, ttl_s)
+    return response
+
+
+async def stream_completion(
+    url: str,
+    headers: dict,
+    payload: dict,
+    ttl_s: float = 0,
+    stop_after: int = 0,
+    max_attempts: int = RETRY_ATTEMPTS,
+    stop_marker: str = "",
+) -> Tuple[int, str]:
+    """Stream a chat completion (SSE) and return ``(status, text)``.
+
+    With ``stop_after`` set, the stream is closed as soon as more than that
+    many characters have arrived and the last delta ends a sentence; pass
+    the length the caller truncates to, the rest would be cut anyway.
+    ``stop_marker`` (matched case-insensitively at the start of a line)
+    closes the stream as soon as it appears, e.g. the sign-off of a letter;
+    the marker itself is not included. On a non-200 status ``text`` is the
+    error body.
+    Finished texts are cached like ``post_cached`` responses. 408/429/5xx,
+    timeouts and network errors are retried with backoff.
+    """
+    payload = {**payload, "stream": True}
+    cacheable = ttl_s > 0 and payload.get("temperature", 1.0) <= MAX_CACHEABLE_TEMPERATURE
+    if cacheable:
+        cache = get_letter_cache()
+        key = make_request_key(url, payload)
+        body = cache.get_response(key)
+        if body is not None:
+            log.debug("HTTP cache hit", url=url, model=payload.get("model"))
+            return 200, body.decode("utf-8")
+
+    content = _encode(payload)
+    for attempt in range(max_attempts - 1):
+        try:
+            status, text, retry_after = await _stream_once(url, headers, content, stop_after, stop_marker)
+        except (httpx.TimeoutException, httpx.NetworkError) as e:
+            delay = _retry_delay(attempt)
+            log.warning("Request failed, retrying", url=url, error=type(e).__name__, delay=round(delay, 2))
+        else:
+            if status not in RETRY_STATUSES:
+                break
+            delay = _retry_delay(attempt, retry_after)
+            log.warning("Retryable status, backing off", url=url, status=status, delay=round(delay, 2))
+        await asyncio.sleep(delay)
+    else:
+        # Last attempt: whatever happens goes to the caller
+        status, text, _ = await _stream_once(url, headers, content, stop_after, stop_marker)
+
+    if status != 200:
+        return status, text
+    if cacheable and text:
+        cache.put_response(key, text.encode("utf-8"), ttl_s)
+    return 200, text
+
+
+async def _stream_once(
+    url: str,
+    headers: dict,
+    content: bytes,
+    stop_after: int,
+    stop_marker: str = "",
+) -> Tuple[int, str, Optional[str]]:
+    """One streamed request: ``(status, text or error body, Retry-After)``."""
+    parts = []
+    length = 0
+    # The same words inside a sentence must not end the stream
+    marker_re = (
+        re.compile(r"^[^\S\n]*" + re.escape(stop_marker), re.IGNORECASE | re.MULTILINE)
+        if stop_marker else None
+    )
+    text = ""  # Everything received so far, kept only when a marker is set
+    async with get_client().stream("POST", url, headers=headers, content=content) as response:
+        log.debug("Completion stream opened", status=response.status_code, http=response.http_version)
+        if response.status_code != 200:
+            await response.aread()
+            return response.status_code, response.text, response.headers.get("retry-after")
+        async for line in response.aiter_lines():
+            if not line.startswith("data: "):
+                continue  # keep-alive comments and blank separators
+            data = line[6:].strip()
+            if data == "[DONE]":
+                break
+            chunk = parse_json(data)
+            if "error" in chunk:
+                log.warning("Error inside completion stream", error=chunk["error"])
+                break
+            choices = chunk.get("choices") or []
+            delta = (choices[0].get("delta") or {}).get("content") if choices else None
+            if not delta:
+                continue
+            parts.append(delta)
+            length += len(delta)
+            if marker_re is not None:
+                # A new match ends in this delta, so it starts on the line of
+                # the last len(stop_marker) characters received before it
+                pos = text.rfind("\n", 0, max(len(text) - len(stop_marker), 0)) + 1
+                text += delta
+                found = marker_re.search(text, pos)
+                if found:
+                    log.debug("Stop marker reached, closing completion stream", chars=length)
+                    return 200, text[:found.start()], None
+            if stop_after and length > stop_after and delta.rstrip().endswith((".", "!", "?")):
+                log.debug("Closing completion stream early", chars=length)
+                break
+
+    return 200, "".join(parts), None
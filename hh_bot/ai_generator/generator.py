@@ -1,8 +1,11 @@
 """AI Cover Letter Generator using OpenRouter API."""
 from __future__ import annotations
 
+import asyncio
+import functools
 import json
-from typing import Optional
+import re
+from typing import List, Optional, Tuple, Union
 
 try:
     import httpx
@@ -11,9 +14,24 @@ except ImportError:
     HAS_HTTPX = False
     httpx = None  # type: ignore
 
-from hh_bot.ai_generator.models import AIGeneratorConfig, AIModel
+from hh_bot.ai_generator.cache import get_letter_cache, make_key, make_scope
+from hh_bot.ai_generator.circuit import CircuitBreaker, is_breaker_failure
+from hh_bot.ai_generator.cleaning import (
+    ARTIFACT_RE,
+    CONTACT_LINE,
+    SUBJECT_LINE,
+    append_signature,
+    clip,
+    ensure_greeting,
+    system_message,
+)
+from hh_bot.ai_generator.client import stream_completion
+from hh_bot.ai_generator.groq_generator import generate_with_groq
+from hh_bot.ai_generator.models import AIGeneratorConfig, AIModel, AIProvider
+from hh_bot.ai_generator.semantic_cache import HAS_SEMANTIC, embed
 from hh_bot.scraper.resume_parser import ResumeInfo
 from hh_bot.scraper.vacancy import VacancyDetails
+from hh_bot.utils.config import Config, get_config
 from hh_bot.utils.logger import get_logger
 
 log = get_logger(__name__)
@@ -21,6 +39,49 @@ log = get_logger(__name__)
 # OpenRouter API endpoint
 OPENROUTER_URL = "https://openrouter.ai/api/v1/chat/completions"
 
+# Static request headers; only Authorization is added per call
+_OPENROUTER_HEADERS = {
+    "Content-Type": "application/json",
+    "HTTP-Referer": "https://github.com/hh-autop",  # Required by OpenRouter
+    "X-Title": "HH Auto-Apply Bot",
+}
+
+# Skips OpenRouter for a minute after repeated 5xx/429/timeouts
+openrouter_breaker = CircuitBreaker("openrouter")
+
+# Free models tried (once) when the configured one returns 404/429
+_FALLBACK_MODELS = (
+    AIModel.MISTRAL_7B_FREE,
+    AIModel.LLAMA_3_1_8B_FREE,
+    AIModel.QWEN_2_5_7B_FREE,
+    AIModel.GEMMA_2_9B_FREE,
+)
+
+# Prompt budget per section, in characters (~3 chars per token for Russian text)
+PROMPT_ABOUT_CHARS = 700
+PROMPT_SKILLS_CHARS = 300
+PROMPT_EXPERIENCE_CHARS = 300
+PROMPT_DESCRIPTION_CHARS = 600
+
+# Letters are cut to this length, at the last sentence end past 70% of it.
+# It is also the stream's stop_after: the stream is closed only once more than
+# this has arrived, so the cut always has the whole budget to choose from.
+MAX_LETTER_CHARS = 700
+# The model's own sign-off is dropped (we append ours), so nothing after it is needed
+LETTER_STOP_MARKER = "С уважением"
+
+# Post-processing patterns (one pass over the text instead of per-line loops)
+_LETTER_JUNK_LINE_RE = re.compile(
+    f"{SUBJECT_LINE}|{CONTACT_LINE}", re.IGNORECASE | re.MULTILINE
+)
+_WS_RE = re.compile(r"\s+")
+_SENT_END_RE = re.compile(r"[.!?](?=\s|$)")
+_ABOUT_HEADER_RE = re.compile(r"О[ \u00a0]себе|About|ABOUT")
+_ABOUT_SKIP_LINE_RE = re.compile(
+    r"(?im)^[^\S\n]*(?:telegram|телеграм|e-mail|email|телефон|phone).*$"
+    r"|^.*(?:грузия|тбилиси|открыт к).*$"
+)
+
 # Default system prompt for cover letter generation
 DEFAULT_SYSTEM_PROMPT = """Ты — эксперт по написанию сопроводительных писем для отклика на вакансии.
 Твоя задача — написать КОРОТКОЕ, ПЕРСОНАЛИЗИРОВАННОЕ сопроводительное письмо на русском языке.
@@ -63,24 +124,32 @@ async def generate_ai_cover_letter(
     """
     Generate a cover letter using AI.
     Tries OpenRouter first, then Groq as fallback.
+    Previously generated letters are served from the letter cache.
     
     Args:
         resume: Parsed resume information
         vacancy: Vacancy details
         vacancy_description: Full vacancy description (optional)
         config: AI generator configuration
+        telegram: Telegram handle for the signature (omitted if None)
+        author_name: Name for the signature (omitted if None)
         
     Returns:
-        Generated cover letter text or None if generation failed
+        Generated cover letter text, or None if generation is disabled or
+        failed, or if the inputs are too thin for a personalized letter
+        (fewer than two of resume title/skills/about and vacancy description,
+        or a vacancy without title or employer). The caller then uses the
+        template letter (``generate_fallback_cover_letter``) instead.
     """
-    log.info("=== GENERATE_AI_COVER_LETTER DEBUG ===")
-    
     if config is None:
         config = AIGeneratorConfig()
     
-    log.info(f"config.enabled: {config.enabled}")
-    log.info(f"config.model: {config.model}")
-    log.info(f"HAS_HTTPX: {HAS_HTTPX}")
+    log.debug(
+        "generate_ai_cover_letter",
+        enabled=config.enabled,
+        model=config.model,
+        has_httpx=HAS_HTTPX,
+    )
     
     if not config.enabled:
         log.warning("❌ AI cover letter generation disabled in config")
@@ -90,28 +159,154 @@ async def generate_ai_cover_letter(
         log.warning("❌ httpx not installed, cannot use AI generation. Install with: pip install httpx")
         return None
     
-    log.info("✅ AI generation prerequisites OK, proceeding...")
+    # Not enough data for a personalized letter: let the caller use the template
+    score = bool(resume.title) + bool(resume.skills) + bool(resume.about) + bool(vacancy_description)
+    if score < 2:
+        log.info("Skipping LLM, falling back: too little resume/vacancy data", score=score)
+        return None
+    if not (vacancy.title and vacancy.employer):
+        log.info("Skipping LLM, falling back: vacancy has no title or employer", vacancy_id=vacancy.vacancy_id)
+        return None
+    
+    log.debug("✅ AI generation prerequisites OK, proceeding...")
+    
+    if not config.cache_enabled:
+        return await _generate_with_providers(
+            resume, vacancy, vacancy_description, config, telegram, author_name
+        )
+    
+    # Check letter cache before any network round-trip
+    cache = get_letter_cache()
+    key = make_key(
+        resume, vacancy, vacancy_description, telegram, author_name,
+        model=config.model, temperature=config.temperature,
+        custom_prompt=config.custom_prompt or "",
+    )
+    scope = make_scope(
+        resume, vacancy, telegram, author_name,
+        model=config.model, temperature=config.temperature,
+        custom_prompt=config.custom_prompt or "",
+    )
+    cached = cache.get(key)
+    tier = "exact"
+    # Embedded once, in a worker thread (the first call also loads the model);
+    # the same vector stores the new letter on a miss
+    embedding = None
+    if cached is None and HAS_SEMANTIC and vacancy_description:
+        embedding = await asyncio.get_running_loop().run_in_executor(
+            None, embed, vacancy_description
+        )
+        cached = cache.get_similar(scope, embedding)
+        tier = "semantic"
+    cache.record(cached is not None)
+    if cached is not None:
+        log.info(
+            "✅ Letter cache hit", tier=tier, vacancy=vacancy.title[:50],
+            hit_rate=round(cache.hit_rate, 2),
+        )
+        return cached
+    log.debug("Letter cache miss", vacancy=vacancy.title[:50], hit_rate=round(cache.hit_rate, 2))
+    
+    result = await _generate_with_providers(
+        resume, vacancy, vacancy_description, config, telegram, author_name
+    )
+    if result:
+        cache.put(key, result, scope=scope, embedding=embedding)
+    return result
+
+
+async def generate_ai_cover_letters_batch(
+    pairs: List[Tuple[ResumeInfo, VacancyDetails, Optional[str]]],
+    config: Optional[AIGeneratorConfig] = None,
+    concurrency: int = 4,
+    telegram: Optional[str] = None,
+    author_name: Optional[str] = None,
+) -> List[Union[Optional[str], BaseException]]:
+    """
+    Generate cover letters for several vacancies concurrently.
+    
+    At most ``concurrency`` requests are in flight at once (keeps free-tier
+    rate limits in check); they share the pooled HTTP client.
     
-    from hh_bot.ai_generator.models import AIProvider
+    Args:
+        pairs: (resume, vacancy, vacancy_description) tuples
+        config: AI generator configuration
+        concurrency: Maximum number of simultaneous API calls
+        
+    Returns:
+        Results in input order: letter text, None, or the raised exception
+    """
+    sem = asyncio.Semaphore(concurrency)
     
+    async def one(pair: Tuple[ResumeInfo, VacancyDetails, Optional[str]]) -> Optional[str]:
+        resume, vacancy, vacancy_description = pair
+        async with sem:
+            return await generate_ai_cover_letter(
+                resume, vacancy, vacancy_description, config, telegram, author_name
+            )
+    
+    return await asyncio.gather(*[one(p) for p in pairs], return_exceptions=True)
+
+
+async def _generate_with_providers(
+    resume: ResumeInfo,
+    vacancy: VacancyDetails,
+    vacancy_description: Optional[str],
+    config: AIGeneratorConfig,
+    telegram: Optional[str] = None,
+    author_name: Optional[str] = None,
+) -> Optional[str]:
+    """Route generation to the configured provider(s)."""
     # Route to appropriate provider
     if config.provider == AIProvider.GROQ:
-        log.info("Using Groq provider")
-        from hh_bot.ai_generator.groq_generator import generate_with_groq
-        return await generate_with_groq(resume, vacancy, vacancy_description, config)
+        log.debug("Using Groq provider")
+        return await generate_with_groq(
+            resume, vacancy, vacancy_description, config, telegram, author_name
+        )
     
     elif config.provider == AIProvider.OPENROUTER:
-        log.info("Using OpenRouter provider")
-        return await _generate_with_openrouter(resume, vacancy, vacancy_description, config)
+        log.debug("Using OpenRouter provider")
+        return await _generate_with_openrouter(
+            resume, vacancy, vacancy_description, config, telegram, author_name
+        )
+    
+    elif config.race_providers:  # AUTO, both at once - first good answer wins
+        log.debug("Auto mode: racing OpenRouter and Groq...")
+        tasks = {
+            asyncio.create_task(
+                _generate_with_openrouter(
+                    resume, vacancy, vacancy_description, config, telegram, author_name
+                ),
+                name="openrouter",
+            ),
+            asyncio.create_task(
+                generate_with_groq(resume, vacancy, vacancy_description, config, telegram, author_name),
+                name="groq",
+            ),
+        }
+        try:
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if not task.cancelled() and task.exception() is None and task.result():
+                        log.info("Provider race won", provider=task.get_name())
+                        return task.result()
+        finally:
+            for task in tasks:
+                task.cancel()
+        
+        log.warning("❌ All AI providers failed")
+        return None
     
     else:  # AUTO - try all providers
-        log.info("Auto mode: trying OpenRouter first...")
-        result = await _generate_with_openrouter(resume, vacancy, vacancy_description, config)
+        log.debug("Auto mode: trying OpenRouter first...")
+        result = await _generate_with_openrouter(
+            resume, vacancy, vacancy_description, config, telegram, author_name
+        )
         if result:
             return result
         
         log.info("🔄 OpenRouter failed, trying Groq...")
-        from hh_bot.ai_generator.groq_generator import generate_with_groq
         result = await generate_with_groq(resume, vacancy, vacancy_description, config, telegram, author_name)
         if result:
             return result
@@ -125,31 +320,42 @@ async def _generate_with_openrouter(
     vacancy: VacancyDetails,
     vacancy_description: Optional[str] = None,
     config: Optional[AIGeneratorConfig] = None,
+    telegram: Optional[str] = None,
+    author_name: Optional[str] = None,
 ) -> Optional[str]:
     """Generate using OpenRouter API."""
     if config is None:
         config = AIGeneratorConfig()
     
+    if not openrouter_breaker.can_execute():
+        log.info("OpenRouter circuit open, skipping")
+        return None
+    
+    # Whether the breaker got a verdict; otherwise a half-open probe slot is given back
+    resolved = False
     try:
         # Build prompt
-        system_prompt = config.custom_prompt or DEFAULT_SYSTEM_PROMPT
-        user_prompt = _build_user_prompt(resume, vacancy, vacancy_description)
+        system_msg = system_message(config.custom_prompt or DEFAULT_SYSTEM_PROMPT)
+        # Config is read once per letter and passed down
+        cfg = get_config()
+        user_prompt = _build_user_prompt(resume, vacancy, vacancy_description, cfg)
         
-        # Prepare API request
-        headers = {
-            "Content-Type": "application/json",
-            "HTTP-Referer": "https://github.com/hh-autop",  # Required by OpenRouter
-            "X-Title": "HH Auto-Apply Bot",
-        }
+        # Rough token estimate (~4 chars per token): trim the description up front
+        # rather than getting an error or a cut-off answer back
+        if vacancy_description and len(user_prompt) // 4 > config.max_tokens * 4:
+            log.info("Prompt too long, trimming vacancy description", chars=len(user_prompt))
+            user_prompt = _build_user_prompt(resume, vacancy, vacancy_description[:400], cfg)
         
+        # Prepare API request
         # Add API key if provided (for non-free models or higher rate limits)
+        headers = _OPENROUTER_HEADERS
         if config.api_key:
-            headers["Authorization"] = f"Bearer {config.api_key}"
+            headers = {**_OPENROUTER_HEADERS, "Authorization": f"Bearer {config.api_key}"}
         
         payload = {
             "model": config.model,
             "messages": [
-                {"role": "system", "content": system_prompt},
+                system_msg,
                 {"role": "user", "content": user_prompt}
             ],
             "max_tokens": config.max_tokens,
@@ -162,112 +368,101 @@ async def _generate_with_openrouter(
             vacancy=vacancy.title[:50],
         )
         
-        log.info(f"Sending request to OpenRouter... URL: {OPENROUTER_URL}")
-        log.info(f"Headers: { {k: '***' if k == 'Authorization' else v for k, v in headers.items()} }")
+        log.debug("Sending request to OpenRouter", url=OPENROUTER_URL, auth=bool(config.api_key))
         
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.post(OPENROUTER_URL, headers=headers, json=payload)
-            
-            log.info(f"Response status: {response.status_code}")
-            
-            # Handle rate limit or model not found - try fallback models
-            if response.status_code in (429, 404):
-                log.warning(f"Model error ({response.status_code}), trying fallback models...")
-                fallback_models = [
-                    AIModel.MISTRAL_7B_FREE,
-                    AIModel.LLAMA_3_1_8B_FREE,
-                    AIModel.QWEN_2_5_7B_FREE,
-                    AIModel.GEMMA_2_9B_FREE,
-                ]
-                for fallback_model in fallback_models:
-                    if fallback_model == config.model:
-                        continue
-                    log.info(f"Trying fallback model: {fallback_model}")
-                    payload["model"] = fallback_model
-                    response = await client.post(OPENROUTER_URL, headers=headers, json=payload)
-                    log.info(f"Fallback response status: {response.status_code}")
-                    if response.status_code == 200:
-                        break
-            
-            response.raise_for_status()
-            data = response.json()
-            
-            log.info(f"Response data keys: {list(data.keys())}")
-            
-            # Extract generated text
-            if "choices" in data and len(data["choices"]) > 0:
-                cover_letter = data["choices"][0]["message"]["content"].strip()
-                log.info(f"✅ AI cover letter generated: {len(cover_letter)} chars")
-                # Clean and truncate if too long
-                cover_letter = _clean_cover_letter(cover_letter)
-                cover_letter = _truncate_letter(cover_letter, max_chars=700, max_paragraphs=5)
-                # Ensure contacts are present
-                cover_letter = _ensure_letter_contacts(cover_letter)
-                log.info(f"✅ Final letter length: {len(cover_letter)} chars")
-                return cover_letter
-            else:
-                log.error(f"❌ Unexpected API response format: {data}")
-                return None
-                
-    except httpx.HTTPStatusError as e:
-        log.error(
-            f"❌ API request failed: HTTP {e.response.status_code}",
-            body=e.response.text[:500],
+        status, content = await stream_completion(
+            OPENROUTER_URL, headers, payload, config.http_cache_ttl, stop_after=MAX_LETTER_CHARS,
+            stop_marker=LETTER_STOP_MARKER,
         )
-        return None
+        
+        log.debug("OpenRouter response", status=status)
+        
+        # 404: the model id is wrong; 429: stream_completion has already backed
+        # off and retried on this model. Either way one other free model gets
+        # a single attempt instead of sweeping the whole list.
+        if status in (429, 404):
+            fallback_model = next((m for m in _FALLBACK_MODELS if m != config.model), None)
+            if fallback_model is not None:
+                log.warning("Model unavailable, trying fallback", status=status, model=fallback_model)
+                payload["model"] = fallback_model
+                status, content = await stream_completion(
+                    OPENROUTER_URL, headers, payload, config.http_cache_ttl,
+                    stop_after=MAX_LETTER_CHARS, max_attempts=1,
+                    stop_marker=LETTER_STOP_MARKER,
+                )
+                log.debug("Fallback response", model=fallback_model, status=status)
+        
+        # Any other answer, even 400/401/404, means the provider is up
+        if is_breaker_failure(status):
+            openrouter_breaker.on_failure()
+        else:
+            openrouter_breaker.on_success()
+        resolved = True
+        if status != 200:
+            log.error("❌ API request failed", status=status, body=content[:500])
+            return None
+        
+        # Extract generated text
+        cover_letter = content.strip()
+        if cover_letter:
+            log.debug("AI cover letter generated", chars=len(cover_letter))
+            # Clean, truncate if too long and add contacts
+            cover_letter = _postprocess_letter(
+                cover_letter, MAX_LETTER_CHARS, max_paragraphs=5,
+                telegram=telegram, name=author_name,
+            )
+            log.info("✅ AI cover letter ready", chars=len(cover_letter))
+            return cover_letter
+        else:
+            log.error("❌ Empty completion from API")
+            return None
+            
     except Exception as e:
-        log.error(f"❌ Failed to generate AI cover letter: {type(e).__name__}: {e}")
-        import traceback
-        log.error(f"Traceback: {traceback.format_exc()}")
+        if isinstance(e, (httpx.TimeoutException, httpx.NetworkError)):
+            openrouter_breaker.on_failure()
+            resolved = True
+        log.error("❌ Failed to generate AI cover letter", error=f"{type(e).__name__}: {e}")
+        # Traceback only at DEBUG (filtered out before formatting otherwise)
+        log.debug("Traceback", exc_info=True)
         return None
+    finally:
+        # Other errors and cancellation
+        if not resolved:
+            openrouter_breaker.release()
 
 
 def _build_user_prompt(
     resume: ResumeInfo,
     vacancy: VacancyDetails,
     vacancy_description: Optional[str] = None,
+    cfg: Optional[Config] = None,
 ) -> str:
     """Build user prompt for AI."""
-    from hh_bot.utils.config import get_config
-    cfg = get_config()
-    
-    # Clean up about text
-    about_clean = ""
-    if resume.about:
-        about_clean = _clean_about_text(resume.about)
-    
-    parts = [
-        "# ДАННЫЕ КАНДИДАТА",
-        f"## Желаемая позиция:\n{resume.title or 'Не указана'}"
-    ]
-    
-    if about_clean:
-        parts.append(f"## Опыт и навыки:\n{about_clean}")
-    
-    if resume.skills:
-        parts.append(f"## Ключевые навыки:\n{resume.skills}")
-    
-    if resume.experience:
-        exp_short = resume.experience[:300] + " …" if len(resume.experience) > 300 else resume.experience
-        parts.append(f"## Опыт работы:\n{exp_short}")
-    
-    # Add Telegram for contact
-    if cfg.auth.telegram:
-        parts.append(f"## Контакт для связи:\nTelegram: @{cfg.auth.telegram}")
-    
-    parts.extend([
-        "",
-        "# ВАКАНСИЯ",
-        f"## Название:\n{vacancy.title}",
-        f"## Компания:\n{vacancy.employer}",
-        f"## Формулировка:\nИспользуй 'в вашей компании {vacancy.employer}' в письме",
-    ])
-    
+    if cfg is None:
+        cfg = get_config()
+    
+    # Candidate block and task block are identical for every vacancy in a run
+    prefix = _resume_prefix(
+        resume.title, resume.about, resume.skills, resume.experience, cfg.auth.telegram
+    )
+    
+    vacancy_block = (
+        "\n# ВАКАНСИЯ"
+        f"\n## Название:\n{vacancy.title}"
+        f"\n## Компания:\n{vacancy.employer}"
+        f"\n## Формулировка:\nИспользуй 'в вашей компании {vacancy.employer}' в письме"
+    )
     if vacancy_description:
-        desc_short = vacancy_description[:600] + " …" if len(vacancy_description) > 600 else vacancy_description
-        parts.append(f"## Описание:\n{desc_short}")
+        desc_short = clip(vacancy_description, PROMPT_DESCRIPTION_CHARS)
+        vacancy_block += f"\n## Описание:\n{desc_short}"
     
-    parts.extend([
+    return "\n".join((prefix, vacancy_block, _task_block(cfg.auth.telegram, cfg.auth.name)))
+
+
+@functools.lru_cache(maxsize=4)
+def _task_block(telegram: str, name: str) -> str:
+    """Build the '# ЗАДАЧА' block of the user prompt."""
+    return "\n".join([
         "",
         "# ЗАДАЧА",
         "Напиши сопроводительное письмо для отклика на эту вакансию.",
@@ -291,139 +486,148 @@ def _build_user_prompt(
         "- Свяжи свой опыт с требованиями (1-2 предложения)",
         "- Призыв к действию (1 предложение)",
         "- НЕ используй общие фразы типа 'у меня есть опыт разработки'",
-        f"- В конце: Telegram: @{cfg.auth.telegram if cfg.auth.telegram else '(указать при наличии)'}",
-        f"- Закончи: 'С уважением, {cfg.auth.name}'",
+        f"- В конце: Telegram: @{telegram if telegram else '(указать при наличии)'}",
+        f"- Закончи: 'С уважением, {name}'",
     ])
-    
-    return "\n".join(parts)
 
 
-def _clean_cover_letter(text: str) -> str:
-    """Clean up generated cover letter."""
-    # Remove common AI artifacts
-    text = text.replace("```", "").replace("```text", "")
+@functools.lru_cache(maxsize=4)
+def _resume_prefix(
+    title: str,
+    about: str,
+    skills: str,
+    experience: str,
+    telegram: str,
+) -> str:
+    """Build the '# ДАННЫЕ КАНДИДАТА' block of the user prompt."""
+    # Clean up about text
+    about_clean = clip(_clean_about_text(about), PROMPT_ABOUT_CHARS) if about else ""
     
-    # Remove "Subject:" or "Re:" lines if present
-    lines = text.split("\n")
-    cleaned_lines = []
-    for line in lines:
-        lower = line.lower().strip()
-        if lower.startswith("subject:") or lower.startswith("re:"):
-            continue
-        cleaned_lines.append(line)
+    parts = [
+        "# ДАННЫЕ КАНДИДАТА",
+        f"## Желаемая позиция:\n{title or 'Не указана'}"
+    ]
     
-    text = "\n".join(cleaned_lines).strip()
+    if about_clean:
+        parts.append(f"## Опыт и навыки:\n{about_clean}")
+    
+    # Skip skills already listed verbatim in the about text
+    if skills and skills.lower() not in about_clean.lower():
+        parts.append(f"## Ключевые навыки:\n{clip(skills, PROMPT_SKILLS_CHARS)}")
     
-    # Ensure proper greeting if missing
-    if not any(text.lower().startswith(g) for g in ["добрый", "здравствуйте", "уважаемый"]):
-        text = f"Добрый день!\n\n{text}"
+    if experience:
+        parts.append(f"## Опыт работы:\n{clip(experience, PROMPT_EXPERIENCE_CHARS)}")
     
-    return text
+    # Add Telegram for contact
+    if telegram:
+        parts.append(f"## Контакт для связи:\nTelegram: @{telegram}")
+    
+    return "\n".join(parts)
 
 
-def _truncate_letter(text: str, max_chars: int = 1000, max_paragraphs: int = 5) -> str:
-    """Truncate letter to reasonable length.
-    
-    Args:
-        text: Generated letter text
-        max_chars: Maximum characters (including spaces)
-        max_paragraphs: Maximum number of paragraphs
+def _postprocess_letter(
+    text: str,
+    max_chars: int = MAX_LETTER_CHARS,
+    max_paragraphs: int = 5,
+    telegram: Optional[str] = None,
+    name: Optional[str] = None,
+) -> str:
+    """Clean, truncate and sign a generated letter in one go.
     
-    Returns:
-        Truncated text with proper ending
+    Strips code fences, "Subject:" lines and any contacts the model wrote,
+    keeps at most ``max_paragraphs`` paragraphs and ``max_chars`` characters
+    (cut at a sentence end), then appends our signature. Contact lines are
+    dropped before paragraphs are counted, so a stray signature doesn't use
+    up the budget.
     """
-    # Split into paragraphs
-    paragraphs = [p.strip() for p in text.split("\n\n") if p.strip()]
-    
-    # Limit paragraphs
-    if len(paragraphs) > max_paragraphs:
-        paragraphs = paragraphs[:max_paragraphs]
-    
-    # Build text and check length
+    # Artifacts, "Subject:" lines and accidental contacts in one regex pass
+    text = _LETTER_JUNK_LINE_RE.sub("", ARTIFACT_RE.sub("", text)).strip()
+    text = ensure_greeting(text)
+    
+    # Take paragraphs until either limit is reached
+    paragraphs = []
+    length = 0
+    for paragraph in text.split("\n\n"):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        length += len(paragraph) + (2 if paragraphs else 0)
+        paragraphs.append(paragraph)
+        if len(paragraphs) >= max_paragraphs or length > max_chars:
+            break
     result = "\n\n".join(paragraphs)
     
-    # If still too long, truncate at sentence boundary
     if len(result) > max_chars:
-        # Find last sentence end before max_chars
-        truncated = result[:max_chars]
-        # Look for sentence endings: . ! ? 
-        for sep in ['. ', '! ', '? ', '.\n', '!\n', '?\n']:
-            last_end = truncated.rfind(sep)
-            if last_end > max_chars * 0.7:  # At least 70% of max length
-                truncated = truncated[:last_end + 1]
-                break
-        result = truncated.strip()
-        log.warning(f"Letter truncated from {len(text)} to {len(result)} chars")
-    
-    # Ensure it ends with proper signature indicator
+        result = _cut_at_sentence(result, max_chars)
+        log.warning("Letter truncated", before=len(text), after=len(result))
+    
     if not result.endswith((".", "!", "?")):
         result += "."
     
-    return result
+    return append_signature(result, telegram, name)
 
 
-def _ensure_letter_contacts(text: str) -> str:
-    """Append Telegram and name signature to the end of letter.
-    
-    Assumes AI generated only the body without contacts.
-    """
-    from hh_bot.utils.config import get_config
-    cfg = get_config()
-    
-    telegram = cfg.auth.telegram
-    name = cfg.auth.name or (cfg.auth.email.split('@')[0] if cfg.auth.email else "")
-    
-    # Clean up any accidental contacts AI might have added
-    lines = text.split('\n')
-    cleaned_lines = []
-    for line in lines:
-        lower = line.lower().strip()
-        # Skip lines that look like contacts
-        if lower.startswith('telegram:') or lower.startswith('с уважением') or lower.startswith('tel:'):
-            continue
-        # Skip standalone @usernames at the end
-        if line.strip().startswith('@') and len(line.strip()) < 30:
-            continue
-        cleaned_lines.append(line)
-    
-    text = '\n'.join(cleaned_lines).strip()
-    
-    # Add contacts at the end
-    if telegram:
-        text += f"\n\nTelegram: @{telegram}"
-    
-    if name:
-        text += f"\n\nС уважением,\n{name}"
-    
-    return text
+def _cut_at_sentence(text: str, max_chars: int) -> str:
+    """Cut text to max_chars, at the last sentence end if it is past 70%."""
+    # Find last sentence end before max_chars
+    truncated = text[:max_chars]
+    # Look for sentence endings: . ! ? 
+    last = None
+    for last in _SENT_END_RE.finditer(truncated):
+        pass
+    if last is not None and last.start() > max_chars * 0.7:  # At least 70% of max length
+        truncated = truncated[:last.end()]
+    return truncated.strip()
 
 
+@functools.lru_cache(maxsize=8)
 def _clean_about_text(text: str) -> str:
     """Clean up 'About' text by removing headers and extra whitespace."""
-    # Remove common headers
-    text = text.replace("О себе", "").replace("О себе", "")  # NBSP and regular space
-    text = text.replace("About", "").replace("ABOUT", "")
-    
-    # Remove Telegram and Email lines (we add them separately)
-    lines = text.split("\n")
-    cleaned_lines = []
-    for line in lines:
-        line = line.strip()
-        if not line:
-            continue
-        # Skip contact info lines
-        if line.lower().startswith(("telegram", "телеграм", "e-mail", "email", "телефон", "phone")):
-            continue
-        # Skip location lines
-        if "грузия" in line.lower() or "тбилиси" in line.lower() or "открыт к" in line.lower():
-            continue
-        cleaned_lines.append(line)
+    # Remove common headers (NBSP and regular space)
+    text = _ABOUT_HEADER_RE.sub("", text)
     
-    # Join and clean up extra whitespace
-    text = " ".join(cleaned_lines)
-    text = " ".join(text.split())  # Remove multiple spaces
+    # Remove contact lines (we add them separately) and location lines
+    text = _ABOUT_SKIP_LINE_RE.sub("", text)
     
-    return text.strip()
+    # Join lines and clean up extra whitespace
+    return _WS_RE.sub(" ", text).strip()
+
+
+_SKILL_SEP_TABLE = str.maketrans({",": "\x00", ";": "\x00", "•": "\x00"})
+
+
+@functools.lru_cache(maxsize=4)
+def _tokenized_skills(skills: str) -> Tuple[str, ...]:
+    """Non-empty resume skills, split on ',', ';' and '•'."""
+    parts = (s.strip() for s in skills.translate(_SKILL_SEP_TABLE).split("\x00"))
+    return tuple(s for s in parts if s)
+
+
+@functools.lru_cache(maxsize=4)
+def _skills_matcher(skills: str) -> Tuple[Tuple[str, ...], Optional["re.Pattern[str]"]]:
+    """Split resume skills and compile one pattern matching any of them.
+
+    Built once per resume and reused for every vacancy in a run.
+    """
+    parts = _tokenized_skills(skills)
+    if not parts:
+        return parts, None
+    # Longest first, inside a lookahead: at every position of the description
+    # the longest skill starting there is reported, overlaps included
+    alternatives = sorted({s.lower() for s in parts}, key=len, reverse=True)
+    pattern = re.compile("(?=(" + "|".join(map(re.escape, alternatives)) + "))")
+    return parts, pattern
+
+
+def _match_skills(skills: str, desc_lower: str) -> List[str]:
+    """Resume skills (in resume order) that occur in the lowercased description."""
+    parts, pattern = _skills_matcher(skills)
+    if pattern is None:
+        return []
+    found = {m.group(1) for m in pattern.finditer(desc_lower)}
+    # A skill that is a prefix of a longer one at the same position is only
+    # reported through that longer match
+    return [s for s in parts if any(s.lower() in f for f in found)]
 
 
 def generate_fallback_cover_letter(
@@ -433,8 +637,43 @@ def generate_fallback_cover_letter(
     vacancy_description: Optional[str] = None,
 ) -> str:
     """Generate a simple fallback cover letter without AI."""
-    from hh_bot.utils.config import get_config
+    return _build_fallback_letter(
+        resume,
+        vacancy_title,
+        company_name,
+        vacancy_description.lower() if vacancy_description else None,
+        get_config(),
+    )
+
+
+def generate_fallback_cover_letters_batch(
+    resume: ResumeInfo,
+    items: List[Tuple[str, str, Optional[str]]],
+) -> List[str]:
+    """Fallback letters for many (vacancy_title, company_name, description) items.
+    
+    Descriptions are lowercased in one pass over the whole batch; the skill
+    pattern for the resume is compiled once and shared by all items.
+    """
+    descriptions = [d or "" for _, _, d in items]
+    if any("\x00" in d for d in descriptions):
+        lowered = [d.lower() for d in descriptions]
+    else:
+        lowered = "\x00".join(descriptions).lower().split("\x00")
     cfg = get_config()
+    return [
+        _build_fallback_letter(resume, title, company, desc_lower or None, cfg)
+        for (title, company, _), desc_lower in zip(items, lowered)
+    ]
+
+
+def _build_fallback_letter(
+    resume: ResumeInfo,
+    vacancy_title: str,
+    company_name: str,
+    desc_lower: Optional[str],
+    cfg: Config,
+) -> str:
     
     parts = ["Добрый день!"]
     
@@ -443,19 +682,13 @@ def generate_fallback_cover_letter(
     
     # Try to extract relevant skills from vacancy description if available
     relevant_skills = []
-    if vacancy_description and resume.skills:
+    if desc_lower and resume.skills:
         # Simple keyword matching
-        desc_lower = vacancy_description.lower()
-        skills_parts = resume.skills.replace(",", "•").replace(";", "•").split("•")
-        for skill in skills_parts:
-            skill_clean = skill.strip()
-            if skill_clean and skill_clean.lower() in desc_lower:
-                relevant_skills.append(skill_clean)
+        relevant_skills = _match_skills(resume.skills, desc_lower)
     
     # If no matching skills found, use first few skills
     if not relevant_skills and resume.skills:
-        skills_parts = resume.skills.replace(",", "•").replace(";", "•").split("•")
-        relevant_skills = [s.strip() for s in skills_parts[:3] if s.strip()]
+        relevant_skills = list(_tokenized_skills(resume.skills)[:3])
     
     # Build experience paragraph
     exp_parts = []
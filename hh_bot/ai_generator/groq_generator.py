@@ -1,7 +1,10 @@
 """AI Cover Letter Generator using Groq API (fast, free tier available)."""
 from __future__ import annotations
 
-from typing import Optional
+import asyncio
+import functools
+import json
+from typing import List, Optional, Tuple
 
 try:
     import httpx
@@ -10,6 +13,14 @@ except ImportError:
     HAS_HTTPX = False
     httpx = None  # type: ignore
 
+from hh_bot.ai_generator.cleaning import (
+    clean_cover_letter,
+    clip,
+    ensure_contacts,
+    smart_truncate,
+    system_message,
+)
+from hh_bot.ai_generator.client import parse_json, post_cached, stream_completion
 from hh_bot.ai_generator.models import AIGeneratorConfig
 from hh_bot.scraper.resume_parser import ResumeInfo
 from hh_bot.scraper.vacancy import VacancyDetails
@@ -20,6 +31,17 @@ log = get_logger(__name__)
 # Groq API endpoint
 GROQ_URL = "https://api.groq.com/openai/v1/chat/completions"
 
+# Groq supported models (fast, cheap), in order of preference
+GROQ_MODELS = (
+    "llama-3.1-8b-instant",  # Fastest, cheapest
+    "llama3-8b-8192",
+    "mixtral-8x7b-32768",
+)
+# A model that hasn't answered by then gets a backup request to the next one
+GROQ_HEDGE_DELAY_S = 5.0
+# Vacancies per JSON-mode request in generate_batch_with_groq
+GROQ_BATCH_SIZE = 4
+
 # Default system prompt - letter body ONLY, no contacts/signature
 DEFAULT_SYSTEM_PROMPT = """Ты пишешь ТОЛЬКО тело сопроводительного письма (без подписи и контактов).
 
@@ -62,6 +84,10 @@ async def generate_with_groq(
         log.warning("❌ Groq API key not provided")
         return None
     
+    if not _has_vacancy_fields(vacancy):
+        log.warning("Skipping Groq: vacancy has no title or employer", vacancy_id=vacancy.vacancy_id)
+        return None
+    
     try:
         # Build prompt
         user_prompt = _build_groq_prompt(resume, vacancy, vacancy_description, telegram, author_name)
@@ -71,52 +97,196 @@ async def generate_with_groq(
             "Authorization": f"Bearer {config.api_key}",
         }
         
-        # Groq supported models (fast, cheap)
-        models_to_try = [
-            "llama-3.1-8b-instant",  # Fastest, cheapest
-            "llama3-8b-8192",
-            "mixtral-8x7b-32768",
-        ]
+        base_payload = {
+            "messages": [
+                system_message(config.custom_prompt or DEFAULT_SYSTEM_PROMPT),
+                {"role": "user", "content": user_prompt}
+            ],
+            "max_tokens": 250,  # Hard limit to ~400-500 chars output
+            "temperature": 0.3,  # Low temperature for concise output
+        }
+        
+        queue = list(GROQ_MODELS)
+        pending: set = set()
         
-        for model in models_to_try:
-            payload = {
-                "model": model,
-                "messages": [
-                    {"role": "system", "content": config.custom_prompt or DEFAULT_SYSTEM_PROMPT},
-                    {"role": "user", "content": user_prompt}
-                ],
-                "max_tokens": 250,  # Hard limit to ~400-500 chars output
-                "temperature": 0.3,  # Low temperature for concise output
-            }
-            
-            log.info(f"Trying Groq model: {model}")
-            
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.post(GROQ_URL, headers=headers, json=payload)
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    if "choices" in data and len(data["choices"]) > 0:
-                        cover_letter = data["choices"][0]["message"]["content"].strip()
-                        log.info(f"✅ Groq generated: {len(cover_letter)} chars")
-                        # Clean, ensure contacts, then truncate to 500 chars
-                        cover_letter = _clean_cover_letter(cover_letter)
-                        # Add contacts BEFORE truncation so they have priority
-                        cover_letter = _ensure_contacts(cover_letter, telegram, author_name)
-                        # Truncate but keep contacts visible
-                        cover_letter = _smart_truncate(cover_letter, max_chars=500)
-                        log.info(f"✅ After truncate: {len(cover_letter)} chars")
-                        return cover_letter
-                
-                log.warning(f"Groq model {model} failed: {response.status_code}")
+        def start_next() -> None:
+            if queue:
+                model = queue.pop(0)
+                log.debug("Trying Groq model", model=model)
+                # Streamed: the text is complete as soon as the last delta arrives
+                pending.add(asyncio.create_task(
+                    stream_completion(GROQ_URL, headers, {**base_payload, "model": model}, config.http_cache_ttl),
+                    name=model,
+                ))
         
+        # Models are tried in order, but a slow one gets a backup request to
+        # the next model after GROQ_HEDGE_DELAY_S; the first letter wins
+        start_next()
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending,
+                    timeout=GROQ_HEDGE_DELAY_S if queue else None,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if not done:
+                    log.debug("Groq model slow, hedging with the next one")
+                    start_next()
+                    continue
+                for task in done:
+                    model = task.get_name()
+                    error = task.exception()
+                    if error is not None:
+                        log.warning("Groq model failed", model=model, error=type(error).__name__)
+                        start_next()
+                        continue
+                    status, content = task.result()
+                    if status == 200 and content.strip():
+                        return _finish_letter(content, model, telegram, author_name)
+                    if _is_request_error(status, content):
+                        # Bad key or bad request: every other model would fail the same way
+                        log.error("❌ Groq rejected the request", status=status, body=content[:200])
+                        return None
+                    log.warning("Groq model failed", model=model, status=status)
+                    start_next()
+        finally:
+            for task in pending:
+                task.cancel()
+    
         return None
         
     except Exception as e:
-        log.error(f"❌ Groq generation failed: {e}")
+        log.error("❌ Groq generation failed", error=f"{type(e).__name__}: {e}")
+        # Traceback only at DEBUG (filtered out before formatting otherwise)
+        log.debug("Traceback", exc_info=True)
         return None
 
 
+async def generate_batch_with_groq(
+    items: List[Tuple[ResumeInfo, VacancyDetails, Optional[str]]],
+    config: Optional[AIGeneratorConfig] = None,
+    telegram: Optional[str] = None,
+    author_name: Optional[str] = None,
+) -> List[Optional[str]]:
+    """Generate letters for several vacancies of one resume, several per request.
+    
+    Every GROQ_BATCH_SIZE vacancies share one JSON-mode completion, so the
+    system prompt and resume are sent (and prefilled) once per chunk.
+    Vacancies the model skipped are retried one by one with
+    generate_with_groq. Results are in input order; vacancies without a
+    title or employer are not sent and stay None.
+    """
+    if not HAS_HTTPX or not config or not config.api_key:
+        return [None] * len(items)
+    
+    results: List[Optional[str]] = [None] * len(items)
+    todo = [i for i, (_, vacancy, _) in enumerate(items) if _has_vacancy_fields(vacancy)]
+    for start in range(0, len(todo), GROQ_BATCH_SIZE):
+        indices = todo[start:start + GROQ_BATCH_SIZE]
+        texts = await _groq_batch_request([items[i] for i in indices], config)
+        for i, text in zip(indices, texts):
+            if text:
+                results[i] = _finish_letter(text, GROQ_MODELS[0], telegram, author_name)
+    
+    missing = [i for i in todo if results[i] is None]
+    if missing:
+        log.debug("Groq batch incomplete, generating the rest one by one", missing=len(missing))
+    for i in missing:
+        resume, vacancy, vacancy_description = items[i]
+        results[i] = await generate_with_groq(
+            resume, vacancy, vacancy_description, config, telegram, author_name
+        )
+    return results
+
+
+async def _groq_batch_request(
+    chunk: List[Tuple[ResumeInfo, VacancyDetails, Optional[str]]],
+    config: AIGeneratorConfig,
+) -> List[Optional[str]]:
+    """One JSON-mode completion for a chunk; a missing letter is None."""
+    resume = chunk[0][0]
+    vacancies = [
+        {
+            "id": i,
+            "title": vacancy.title,
+            "company": vacancy.employer,
+            "description": clip(vacancy_description or "", 500),
+        }
+        for i, (_, vacancy, vacancy_description) in enumerate(chunk)
+    ]
+    user_prompt = "\n".join((
+        _groq_resume_block(resume.title, resume.about, resume.skills),
+        "# ВАКАНСИИ (JSON)",
+        json.dumps(vacancies, ensure_ascii=False),
+        _GROQ_TASK_BLOCK,
+        "Напиши отдельное письмо для КАЖДОЙ вакансии. Ответ — только JSON:",
+        '{"letters": [{"id": <id вакансии>, "text": "<письмо>"}]}',
+    ))
+    payload = {
+        "model": GROQ_MODELS[0],
+        "messages": [
+            system_message(config.custom_prompt or DEFAULT_SYSTEM_PROMPT),
+            {"role": "user", "content": user_prompt},
+        ],
+        "max_tokens": 250 * len(chunk),
+        "temperature": 0.3,
+        "response_format": {"type": "json_object"},
+    }
+    headers = {
+        "Content-Type": "application/json",
+        "Authorization": f"Bearer {config.api_key}",
+    }
+    
+    texts: List[Optional[str]] = [None] * len(chunk)
+    try:
+        response = await post_cached(GROQ_URL, headers, payload, config.http_cache_ttl)
+        if response.status_code != 200:
+            log.warning("Groq batch request failed", status=response.status_code)
+            return texts
+        content = parse_json(response.content)["choices"][0]["message"]["content"]
+        for item in parse_json(content).get("letters") or []:
+            i = item.get("id")
+            if isinstance(i, int) and 0 <= i < len(chunk) and isinstance(item.get("text"), str):
+                texts[i] = item["text"].strip() or None
+    except Exception as e:
+        log.warning("Groq batch request failed", error=f"{type(e).__name__}: {e}")
+    return texts
+
+
+def _finish_letter(
+    content: str,
+    model: str,
+    telegram: Optional[str],
+    author_name: Optional[str],
+) -> str:
+    cover_letter = content.strip()
+    log.debug("Groq generated", model=model, chars=len(cover_letter))
+    # Clean, ensure contacts, then truncate to 500 chars
+    cover_letter = clean_cover_letter(cover_letter)
+    # Add contacts BEFORE truncation so they have priority
+    cover_letter = ensure_contacts(cover_letter, telegram, author_name)
+    # Truncate but keep contacts visible
+    cover_letter = smart_truncate(cover_letter, max_chars=500)
+    log.info("✅ Groq cover letter ready", chars=len(cover_letter))
+    return cover_letter
+
+
+def _has_vacancy_fields(vacancy: VacancyDetails) -> bool:
+    """Without a position and company the model can only write a generic letter."""
+    return bool(vacancy.title and vacancy.employer)
+
+
+def _is_request_error(status: int, body: str) -> bool:
+    """4xx that no other model can fix (auth, malformed request).
+
+    429 is retried inside stream_completion; 404 and model errors
+    (e.g. a decommissioned model answers 400) move on to the next model.
+    """
+    if status in (401, 403):
+        return True
+    return 400 <= status < 500 and status not in (404, 429) and "model" not in body.lower()
+
+
 def _build_groq_prompt(
     resume: ResumeInfo,
     vacancy: VacancyDetails,
@@ -125,165 +295,48 @@ def _build_groq_prompt(
     author_name: Optional[str] = None,
 ) -> str:
     """Build prompt for Groq."""
-    from hh_bot.utils.config import get_config
-    cfg = get_config()
-    
+    # Only the vacancy lines change between letters of a run
     parts = [
-        "Напиши сопроводительное письмо для отклика на вакансию.",
-        "",
-        "# ДАННЫЕ КАНДИДАТА",
-        f"Позиция: {resume.title or 'Не указана'}",
-    ]
-    
-    if resume.about:
-        # Clean about text
-        about = resume.about.replace("О себе", "").strip()[:300]
-        parts.append(f"О себе: {about}")
-    
-    if resume.skills:
-        parts.append(f"Навыки: {resume.skills}")
-    
-    parts.extend([
-        "",
+        _groq_resume_block(resume.title, resume.about, resume.skills),
         "# ВАКАНСИЯ",
         f"Название: {vacancy.title}",
         f"Компания: {vacancy.employer}",
-    ])
+    ]
     
     if vacancy_description:
-        desc = vacancy_description[:500] if len(vacancy_description) > 500 else vacancy_description
-        parts.append(f"Описание: {desc}")
-    
-    parts.extend([
-        "",
-        "# ТРЕБОВАНИЯ К ПИСЬМУ",
-        "1. Начни с 'Добрый день!'",
-        "2. Упомяни вакансию и компанию",
-        "3. Свяжи свои навыки с требованиями вакансии",
-        "4. Будь конкретным — укажи технологии из вакансии",
-        "5. Максимум 3 абзаца (приветствие, опыт, призыв)",
-        "6. НЕ добавляй Telegram — будет добавлен отдельно",
-        "7. НЕ добавляй подпись 'С уважением' — будет добавлена отдельно",
-    ])
-    
-    return "\n".join(filter(None, parts))
-
-
-def _clean_cover_letter(text: str) -> str:
-    """Clean up generated cover letter."""
-    text = text.replace("```", "").replace("```text", "")
-    
-    lines = text.split("\n")
-    cleaned_lines = []
-    for line in lines:
-        lower = line.lower().strip()
-        if lower.startswith("subject:") or lower.startswith("re:"):
-            continue
-        cleaned_lines.append(line)
-    
-    text = "\n".join(cleaned_lines).strip()
-    
-    # Ensure proper greeting
-    if not any(text.lower().startswith(g) for g in ["добрый", "здравствуйте", "уважаемый"]):
-        text = f"Добрый день!\n\n{text}"
+        parts.append(f"Описание: {clip(vacancy_description, 500)}")
     
-    return text
+    parts.append(_GROQ_TASK_BLOCK)
+    return "\n".join(parts)
 
 
-def _smart_truncate(text: str, max_chars: int = 500) -> str:
-    """Smart truncate that keeps contacts (last 2 paragraphs) visible.
-    
-    Priority: keep Telegram and signature, truncate body if needed.
-    """
-    if len(text) <= max_chars:
-        return text
-    
-    paragraphs = [p.strip() for p in text.split('\n\n') if p.strip()]
-    
-    # Identify contact paragraphs (last 1-2 paragraphs usually)
-    contact_markers = ['telegram', 'с уважением', 'телеграм', '@', 'tel:', 'phone:']
-    contact_paragraphs = []
-    body_paragraphs = []
-    
-    for i, p in enumerate(paragraphs):
-        p_lower = p.lower()
-        if any(m in p_lower for m in contact_markers) or i >= len(paragraphs) - 2:
-            # Last 2 paragraphs or paragraphs with contact markers
-            contact_paragraphs.append(p)
-        else:
-            body_paragraphs.append(p)
-    
-    # Calculate space needed for contacts
-    contacts_text = '\n\n'.join(contact_paragraphs)
-    contacts_len = len(contacts_text)
+@functools.lru_cache(maxsize=4)
+def _groq_resume_block(title: str, about: str, skills: str) -> str:
+    """Build the opening and '# ДАННЫЕ КАНДИДАТА' block of the Groq prompt."""
+    parts = [
+        "Напиши сопроводительное письмо для отклика на вакансию.",
+        "# ДАННЫЕ КАНДИДАТА",
+        f"Позиция: {title or 'Не указана'}",
+    ]
     
-    # Available space for body
-    available_for_body = max_chars - contacts_len - 10  # 10 for padding
+    if about:
+        # Clean about text
+        about = clip(about.replace("О себе", "").strip(), 300)
+        parts.append(f"О себе: {about}")
     
-    if available_for_body < 100:
-        # Not enough space, keep only greeting + minimal body + contacts
-        if body_paragraphs:
-            body_text = body_paragraphs[0][:100] + "..." if len(body_paragraphs[0]) > 100 else body_paragraphs[0]
-            result = body_text + '\n\n' + contacts_text
-        else:
-            result = contacts_text
-    else:
-        # Build body within limit
-        body_parts = []
-        current_len = 0
-        for p in body_paragraphs:
-            if current_len + len(p) + 2 <= available_for_body:  # +2 for \n\n
-                body_parts.append(p)
-                current_len += len(p) + 2
-            else:
-                # Try to add partial paragraph ending with sentence
-                remaining = available_for_body - current_len
-                if remaining > 50:
-                    partial = p[:remaining]
-                    for sep in ['. ', '! ', '? ']:
-                        last_end = partial.rfind(sep)
-                        if last_end > remaining * 0.5:
-                            body_parts.append(partial[:last_end + 1])
-                            break
-                break
-        
-        # Combine body + contacts
-        if body_parts:
-            result = '\n\n'.join(body_parts) + '\n\n' + contacts_text
-        else:
-            result = contacts_text
+    if skills:
+        parts.append(f"Навыки: {skills}")
     
-    log.warning(f"Letter SMART truncated from {len(text)} to {len(result)} chars, kept {len(contact_paragraphs)} contact paragraphs")
-    return result.strip()
+    return "\n".join(filter(None, parts))
 
 
-def _ensure_contacts(text: str, telegram: Optional[str], author_name: Optional[str]) -> str:
-    """Append Telegram and name signature to the end of letter.
-    
-    Assumes AI generated only the body without contacts.
-    """
-    name = author_name
-    
-    # Clean up any accidental contacts AI might have added
-    lines = text.split('\n')
-    cleaned_lines = []
-    for line in lines:
-        lower = line.lower().strip()
-        # Skip lines that look like contacts (but keep the rest)
-        if lower.startswith('telegram:') or lower.startswith('с уважением') or lower.startswith('tel:'):
-            continue
-        # Skip standalone @usernames at the end
-        if line.strip().startswith('@') and len(line.strip()) < 30:
-            continue
-        cleaned_lines.append(line)
-    
-    text = '\n'.join(cleaned_lines).strip()
-    
-    # Add contacts at the end
-    if telegram:
-        text += f"\n\nTelegram: @{telegram}"
-    
-    if name:
-        text += f"\n\nС уважением,\n{name}"
-    
-    return text
+_GROQ_TASK_BLOCK = "\n".join([
+    "# ТРЕБОВАНИЯ К ПИСЬМУ",
+    "1. Начни с 'Добрый день!'",
+    "2. Упомяни вакансию и компанию",
+    "3. Свяжи свои навыки с требованиями вакансии",
+    "4. Будь конкретным — укажи технологии из вакансии",
+    "5. Максимум 3 абзаца (приветствие, опыт, призыв)",
+    "6. НЕ добавляй Telegram — будет добавлен отдельно",
+    "7. НЕ добавляй подпись 'С уважением' — будет добавлена отдельно",
+])
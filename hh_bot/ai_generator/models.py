@@ -29,18 +29,21 @@ class AIProvider(str, Enum):
     AUTO = "auto"  # Try all providers
 
 
-@dataclass
+@dataclass(frozen=True)
 class AIGeneratorConfig:
     """Configuration for AI cover letter generation."""
     enabled: bool = False
     provider: str = AIProvider.AUTO  # openrouter, groq, или auto (попробовать все)
+    race_providers: bool = False  # auto: оба провайдера параллельно (быстрее, но дважды тратит лимиты)
     api_key: str = ""  # API ключ (OpenRouter или Groq)
     model: str = AIModel.MISTRAL_7B_FREE  # Дефолтная модель (для OpenRouter)
     max_tokens: int = 500
     temperature: float = 0.7
     custom_prompt: Optional[str] = None
+    cache_enabled: bool = True  # Кэш писем (./data/letter_cache.db)
+    http_cache_ttl: int = 86400  # TTL кэша ответов API, сек (0 - выключен; только temperature <= 0.3)
     
     @property
     def is_free_model(self) -> bool:
-        """Check if using a free model."""
-        return ":free" in self.model
+        """Check if using a free model (OpenRouter ids end with ":free")."""
+        return self.model.endswith(":free")
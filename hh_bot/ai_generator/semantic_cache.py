@@ -0,0 +1,137 @@
+"""Semantic tier of the letter cache.
+
+Vacancy descriptions are embedded with a small multilingual model and
+compared by cosine similarity, only against letters of the same scope
+(resume, employer, position and contacts). Vectors are stored in SQLite
+next to the letters; once a scope has been searched its vectors are kept
+as one in-memory matrix, so later lookups are a single matrix product.
+
+Enabled only if ``sentence-transformers`` is installed.
+"""
+from __future__ import annotations
+
+import importlib.util
+import sqlite3
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from hh_bot.utils.logger import get_logger
+
+log = get_logger(__name__)
+
+# Vacancies are mostly in Russian, so an English-only model scores poorly
+EMBEDDING_MODEL = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
+SEMANTIC_THRESHOLD = 0.92
+# The model reads only its first 128 tokens; no need to tokenize the rest
+EMBED_MAX_CHARS = 1000
+
+HAS_SEMANTIC = importlib.util.find_spec("sentence_transformers") is not None
+
+_encoder: Optional[Any] = None
+_encoder_lock = threading.Lock()
+
+
+def _get_encoder() -> Any:
+    """Load the embedding model on first use (import + load takes seconds).
+
+    The model stays resident for the rest of the process.
+    """
+    global _encoder
+    if _encoder is None:
+        with _encoder_lock:
+            if _encoder is None:
+                from sentence_transformers import SentenceTransformer
+                log.info("Loading embedding model", model=EMBEDDING_MODEL)
+                _encoder = SentenceTransformer(EMBEDDING_MODEL, device="cpu")
+    return _encoder
+
+
+def embed(text: str):
+    """Normalized float32 embedding of a vacancy description.
+
+    Blocks for tens of milliseconds (seconds on the first call, which loads
+    the model), so async callers run it in an executor.
+    """
+    import numpy as np
+
+    vec = _get_encoder().encode(text[:EMBED_MAX_CHARS], normalize_embeddings=True)
+    return np.asarray(vec, dtype=np.float32)
+
+
+class SemanticIndex:
+    """Embeddings of cached letters, grouped by scope."""
+
+    def __init__(self, conn: sqlite3.Connection) -> None:
+        self._conn = conn
+        # scope -> (letter keys, matrix with one row per key)
+        self._scopes: Dict[str, Tuple[List[str], Any]] = {}
+        self._init_schema()
+
+    def _init_schema(self) -> None:
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS letter_embeddings (
+                key          TEXT PRIMARY KEY,
+                scope        TEXT,
+                embedding    BLOB
+            )
+        """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_letter_embeddings_scope ON letter_embeddings (scope)"
+        )
+
+    def _load(self, scope: str) -> Tuple[List[str], Any]:
+        loaded = self._scopes.get(scope)
+        if loaded is None:
+            import numpy as np
+
+            rows = self._conn.execute(
+                "SELECT key, embedding FROM letter_embeddings WHERE scope = ?", (scope,)
+            ).fetchall()
+            keys = [r[0] for r in rows]
+            matrix = np.frombuffer(b"".join(r[1] for r in rows), dtype=np.float32)
+            loaded = (keys, matrix.reshape(len(rows), -1) if rows else None)
+            self._scopes[scope] = loaded
+        return loaded
+
+    def search(self, scope: str, vec: Any) -> Optional[str]:
+        """Key of the closest letter in the scope, if it is similar enough."""
+        keys, matrix = self._load(scope)
+        if not keys:
+            return None
+
+        import numpy as np
+
+        scores = matrix @ vec
+        best = int(np.argmax(scores))
+        if float(scores[best]) < SEMANTIC_THRESHOLD:
+            return None
+        log.debug("Semantic cache candidate", score=round(float(scores[best]), 3))
+        return keys[best]
+
+    def add(self, key: str, scope: str, vec: Any) -> None:
+        """Store the embedding of a new letter (the caller commits)."""
+        self._conn.execute(
+            """
+            INSERT OR REPLACE INTO letter_embeddings (key, scope, embedding)
+            VALUES (?, ?, ?)
+            """,
+            (key, scope, vec.tobytes()),
+        )
+        # A scope not loaded yet is read from SQLite on its first search
+        if scope in self._scopes:
+            import numpy as np
+
+            keys, matrix = self._scopes[scope]
+            if key in keys:
+                del self._scopes[scope]
+            else:
+                row = vec.reshape(1, -1)
+                self._scopes[scope] = (keys + [key], row if matrix is None else np.vstack([matrix, row]))
+
+    def prune(self) -> None:
+        """Drop embeddings of evicted letters (the caller commits)."""
+        cur = self._conn.execute(
+            "DELETE FROM letter_embeddings WHERE key NOT IN (SELECT key FROM letters)"
+        )
+        if cur.rowcount:
+            self._scopes.clear()
@@ -1,8 +1,11 @@
 from __future__ import annotations
 
 import asyncio
+import json
+import time
+from pathlib import Path
 
-from patchright.async_api import Page, TimeoutError as PatchrightTimeout
+from patchright.async_api import Locator, Page, TimeoutError as PatchrightTimeout
 
 from hh_bot.browser.human import human_click_locator, human_type_locator, random_micro_move
 from hh_bot.utils.config import get_config
@@ -14,56 +17,234 @@ log = get_logger(__name__)
 LOGIN_URL = "https://hh.ru/account/login?role=applicant"
 APPLICANT_URL = "https://hh.ru/applicant/resumes"
 
+# A login verified less than this long ago is trusted without loading anything,
+# as long as the auth cookie is still there
+SESSION_TRUST_S = 10 * 60
+AUTH_COOKIE = "hhtoken"
+# How long login checks wait for a telling element after navigation
+CHECK_TIMEOUT_MS = 5000
+
+# Selectors, built once instead of on every check
+# Logged-in state
+AVATAR_SELECTOR = (
+    "[data-qa='account-icon'], "
+    "[data-qa='user-avatar'], "
+    ".account-icon"
+)
+RESUME_CONTENT_SELECTOR = (
+    "[data-qa='resume'], "
+    ".applicant-resumes, "
+    "[data-qa='resumes-empty-state'], "
+    ".resume-item"
+)
+
+# Logged-out state
+LOGIN_FORM_SELECTOR = (
+    "[data-qa='account-login-form'], "
+    "input[name='login'], "
+    "input[placeholder*='почта'], "
+    "input[placeholder*='email']"
+)
+LOGIN_LINK_SELECTOR = "[data-qa='login']"
+
+# Account menu
+PROFILE_MENU_SELECTOR = (
+    "[data-qa='profile-menu-button'], "
+    "[data-qa='user-menu'], "
+    "[data-qa='account-menu'], "
+    "[data-qa='profileAndResumes-button']"
+)
+LOGOUT_BUTTON_SELECTOR = (
+    "[data-qa='logout-button'], "
+    "[data-qa='header-logout'], "
+    "a[href*='/logout'], "
+    "button:has-text('Выйти'), "
+    "a:has-text('Выйти')"
+)
+
+# Current account email (settings page / profile menu)
+EMAIL_VALUE_SELECTOR = (
+    "[data-qa='email-value'], "
+    "[data-qa='account-email'], "
+    ".account-email, "
+    "input[type='email'][readonly], "
+    "input[type='email'][disabled]"
+)
+PROFILE_MENU_EMAIL_SELECTOR = (
+    ".profile-menu-email, "
+    "[data-qa='profile-menu-email'], "
+    ".user-menu-email"
+)
+
+# Login form
+EMAIL_INPUT_SELECTOR = (
+    "[data-qa='applicant-login-input-email'], "
+    "[data-qa='login-input-username'], "
+    "[data-qa='magritte-input-email'], "
+    "input[type='email'], "
+    "input[name='username'], "
+    "input[name='login'], "
+    "input[placeholder*='почта'], "
+    "input[placeholder*='email']"
+)
+CONTINUE_BUTTON_SELECTOR = (
+    "[data-qa='account-login-submit'], "
+    "[data-qa='magritte-button-main-action'], "
+    "button[type='submit'], "
+    "button:has-text('Дальше'), "
+    "button:has-text('Продолжить')"
+)
+CODE_INPUT_SELECTOR = (
+    "[data-qa='account-login-code-input'], "
+    "[data-qa='magritte-code-input'], "
+    "input[name='code'], "
+    "input[autocomplete='one-time-code'], "
+    "input[maxlength='6'], "
+    "input[placeholder*='код']"
+)
+CODE_SUBMIT_SELECTOR = (
+    "[data-qa='account-login-code-submit'], "
+    "[data-qa='account-login-submit'], "
+    "button[type='submit'], "
+    "button:has-text('Подтвердить'), "
+    "button:has-text('Войти')"
+)
+
+
+def _session_file() -> Path:
+    """Login verification marker, stored next to the browser profile."""
+    return Path(get_config().browser.profile_dir).parent / "session.json"
+
+
+def _session_is_fresh() -> bool:
+    try:
+        data = json.loads(_session_file().read_text(encoding="utf-8"))
+        return time.time() - float(data["verified_at"]) < SESSION_TRUST_S
+    except (OSError, ValueError, KeyError, TypeError):
+        return False
+
+
+async def _has_auth_cookie(page: Page) -> bool:
+    """Whether the context holds an hh.ru auth cookie that isn't about to expire."""
+    try:
+        cookies = {c["name"]: c for c in await page.context.cookies("https://hh.ru")}
+    except Exception as e:
+        log.debug("Could not read cookies", error=str(e))
+        return False
+    token = cookies.get(AUTH_COOKIE)
+    if token is None:
+        return False
+    expires = token.get("expires", -1)  # -1: session cookie
+    if 0 <= expires < time.time() + 60:
+        return False
+    # Logged-out visitors get hhrole=anonymous
+    role = cookies.get("hhrole")
+    return role is None or role.get("value") != "anonymous"
+
+
+def _mark_session_verified() -> None:
+    path = _session_file()
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps({"verified_at": time.time()}), encoding="utf-8")
+    except OSError as e:
+        log.debug("Could not save session marker", error=str(e))
+
+
+async def _ainput(prompt: str) -> str:
+    """input() in a worker thread, so the event loop keeps running meanwhile."""
+    return await asyncio.get_running_loop().run_in_executor(None, input, prompt)
+
+
+async def _first_attached(*locators: Locator, timeout: float = CHECK_TIMEOUT_MS) -> int:
+    """Index of the first locator that appears in the DOM, or -1 on timeout.
+
+    Returns as soon as one of them is attached instead of sleeping a fixed
+    page-load delay and polling count().
+    """
+    tasks = [
+        asyncio.create_task(loc.first.wait_for(state="attached", timeout=timeout))
+        for loc in locators
+    ]
+    try:
+        pending = set(tasks)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            found = [tasks.index(t) for t in done if t.exception() is None]
+            if found:
+                return min(found)
+        return -1
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def _email_from_profile_menu(page: Page) -> str | None:
+    """Open the profile menu on the current page and read the email from it."""
+    # Click on profile menu to see email
+    profile_btn = page.locator(PROFILE_MENU_SELECTOR).first
+    
+    if await profile_btn.count() > 0:
+        await profile_btn.click()
+        await sleep_micro()
+        
+        # Look for email in dropdown
+        email_in_menu = page.locator(PROFILE_MENU_EMAIL_SELECTOR).first
+        
+        if await email_in_menu.count() > 0:
+            email = await email_in_menu.inner_text()
+            if email and "@" in email:
+                return email.strip()
+    return None
+
+
+async def _first_present(page: Page, *selectors: str, timeout: float = CHECK_TIMEOUT_MS) -> int:
+    """Index of the first CSS selector with a match in the page, or -1 on timeout.
+
+    One wait_for_function call: the page itself polls all selectors, instead
+    of one Playwright wait per selector. Plain CSS only (no :has-text()).
+    """
+    try:
+        found = await page.wait_for_function(
+            """sels => {
+                for (let i = 0; i < sels.length; i++) {
+                    if (document.querySelector(sels[i])) return i + 1;
+                }
+                return 0;
+            }""",
+            arg=list(selectors),
+            timeout=timeout,
+        )
+    except PatchrightTimeout:
+        return -1
+    return await found.json_value() - 1
+
 
 async def get_current_user_email(page: Page) -> str | None:
-    """Get email of currently logged in user, or None if not logged in."""
+    """Get email of currently logged in user, or None if not logged in.
+
+    The page left open by is_logged_in() is tried first, so the usual case
+    needs no extra navigation.
+    """
     try:
+        if page.url.startswith("https://hh.ru/"):
+            email = await _email_from_profile_menu(page)
+            if email:
+                log.debug("Found current user email in profile menu", email=email)
+                return email
+
         # Go to profile/settings page to see email
         await page.goto("https://hh.ru/applicant/settings", wait_until="domcontentloaded", timeout=10000)
-        await sleep_page_load()
         
         # Look for email on the page
-        email_el = page.locator(
-            "[data-qa='email-value'], "
-            "[data-qa='account-email'], "
-            ".account-email, "
-            "input[type='email'][readonly], "
-            "input[type='email'][disabled]"
-        ).first
+        email_el = page.locator(EMAIL_VALUE_SELECTOR).first
         
-        if await email_el.count() > 0:
+        if await _first_attached(email_el) == 0:
             email = await email_el.input_value() or await email_el.inner_text()
             if email and "@" in email:
                 log.debug("Found current user email", email=email)
                 return email.strip()
         
-        # Try to find email in account menu
-        await page.goto("https://hh.ru/", wait_until="domcontentloaded", timeout=10000)
-        await sleep_page_load()
-        
-        # Click on profile menu to see email
-        profile_btn = page.locator(
-            "[data-qa='profile-menu-button'], "
-            "[data-qa='user-menu'], "
-            "[data-qa='account-menu']"
-        ).first
-        
-        if await profile_btn.count() > 0:
-            await profile_btn.click()
-            await sleep_micro()
-            
-            # Look for email in dropdown
-            email_in_menu = page.locator(
-                ".profile-menu-email, "
-                "[data-qa='profile-menu-email'], "
-                ".user-menu-email"
-            ).first
-            
-            if await email_in_menu.count() > 0:
-                email = await email_in_menu.inner_text()
-                if email and "@" in email:
-                    return email.strip()
-        
         return None
     except Exception as e:
         log.debug("Error getting current user email", error=str(e))
@@ -77,30 +258,18 @@ async def logout(page: Page) -> bool:
         
         # Try to find logout button
         await page.goto("https://hh.ru/", wait_until="domcontentloaded", timeout=10000)
-        await sleep_page_load()
         
         # Open profile menu
-        profile_btn = page.locator(
-            "[data-qa='profile-menu-button'], "
-            "[data-qa='user-menu'], "
-            "[data-qa='account-menu'], "
-            "[data-qa='profileAndResumes-button']"
-        ).first
+        profile_btn = page.locator(PROFILE_MENU_SELECTOR).first
         
-        if await profile_btn.count() > 0:
+        if await _first_attached(profile_btn) == 0:
             await profile_btn.click()
             await sleep_micro()
         
         # Look for logout link/button
-        logout_btn = page.locator(
-            "[data-qa='logout-button'], "
-            "[data-qa='header-logout'], "
-            "a[href*='/logout'], "
-            "button:has-text('Выйти'), "
-            "a:has-text('Выйти')"
-        ).first
+        logout_btn = page.locator(LOGOUT_BUTTON_SELECTOR).first
         
-        if await logout_btn.count() > 0:
+        if await _first_attached(logout_btn, timeout=2000) == 0:
             await logout_btn.click()
             await sleep_page_load()
             log.info("Successfully logged out")
@@ -113,42 +282,61 @@ async def logout(page: Page) -> bool:
         return False
 
 
+async def _probe_auth(page: Page) -> bool | None:
+    """Login state from one HTTP request, without rendering a page.
+
+    The request shares the browser context's cookies. Only the redirect and
+    the auth cookie are trusted: a redirect to the login page or no usable
+    hhtoken after the response means logged out, a 200 with one means logged
+    in. Anything else (network error, other statuses) returns None; callers
+    then fall back to opening the page.
+    """
+    try:
+        response = await page.request.get(APPLICANT_URL, max_redirects=0, timeout=CHECK_TIMEOUT_MS * 2)
+    except Exception as e:
+        log.debug("Auth probe failed", error=str(e))
+        return None
+    if 300 <= response.status < 400:
+        return False if "login" in response.headers.get("location", "") else None
+    if response.status != 200:
+        return None
+    # Read after the response, so a token the server has just dropped counts
+    logged_in = await _has_auth_cookie(page)
+    log.debug("Auth probe", logged_in=logged_in)
+    return logged_in
+
+
 async def is_logged_in(page: Page) -> bool:
     """Check if the user is already logged in by looking for profile elements."""
+    state = await _probe_auth(page)
+    if state is not None:
+        if state:
+            log.info("Already logged in (auth probe)")
+        return state
+    return await _check_applicant_page(page)
+
+
+async def _check_applicant_page(page: Page) -> bool:
+    """Open the applicant area once and see what renders first.
+
+    Not just URL, because hh.ru shows login form on the same URL.
+    """
     try:
-        await page.goto("https://hh.ru/", wait_until="domcontentloaded", timeout=15000)
-        await sleep_page_load()
-        # Look for account menu or avatar that only appears when logged in
-        avatar = page.locator("[data-qa='account-icon'], [data-qa='user-avatar'], .account-icon")
-        if await avatar.count() > 0:
-            log.info("Already logged in (found account icon)")
-            return True
-        
-        # Navigate to applicant area and check for actual logged-in content
-        # (not just URL, because hh.ru shows login form on the same URL)
         await page.goto(APPLICANT_URL, wait_until="domcontentloaded", timeout=15000)
-        await sleep_page_load()
         
-        # Check for login form - if present, user is NOT logged in
-        login_form = page.locator(
-            "[data-qa='account-login-form'], "
-            "input[name='login'], "
-            "input[placeholder*='почта'], "
-            "input[placeholder*='email']"
+        found = await _first_present(
+            page,
+            # Login form or login link means the user is NOT logged in
+            LOGIN_FORM_SELECTOR,
+            LOGIN_LINK_SELECTOR,
+            # Resume content and the account icon only appear when logged in
+            RESUME_CONTENT_SELECTOR,
+            AVATAR_SELECTOR,
         )
-        if await login_form.count() > 0:
+        if found in (0, 1):
             log.info("Login form found - user is not logged in")
-            return False
-        
-        # Check for resume content that only appears when logged in
-        resume_content = page.locator(
-            "[data-qa='resume'], "
-            ".applicant-resumes, "
-            "[data-qa='resumes-empty-state'], "
-            ".resume-item"
-        )
-        if await resume_content.count() > 0:
-            log.info("Already logged in (found resume content)")
+        elif found >= 2:
+            log.info("Already logged in", found="resume content" if found == 2 else "account icon")
             return True
             
     except Exception as e:
@@ -156,12 +344,22 @@ async def is_logged_in(page: Page) -> bool:
     return False
 
 
-async def do_login_with_email(page: Page, email: str) -> None:
-    """Perform full email login flow with provided email."""
+async def do_login_with_email(
+    page: Page,
+    email: str,
+    known_login_state: bool | None = None,
+) -> None:
+    """Perform full email login flow with provided email.
+
+    ``known_login_state`` skips the login check when the caller has just
+    done it (False: not logged in, True: logged in, None: check).
+    """
     log.info("Starting login with provided email", email=email)
     
+    if known_login_state is None:
+        known_login_state = await is_logged_in(page)
     # Check if already logged in with different account
-    if await is_logged_in(page):
+    if known_login_state:
         current_email = await get_current_user_email(page)
         if current_email and current_email.lower() != email.lower():
             log.info(
@@ -186,18 +384,22 @@ async def do_login_with_email(page: Page, email: str) -> None:
     
     log.info("Navigating to login page")
     await page.goto(LOGIN_URL, wait_until="domcontentloaded", timeout=20000)
-    await sleep_page_load()
 
-    # Step 1: Click "Войти" (Log in) button on the account type selection screen
     login_btn = page.locator("button:has-text('Войти')").first
-    if await login_btn.count() > 0:
+    email_label = page.locator("text=Почта").first
+    email_input = page.locator(EMAIL_INPUT_SELECTOR).first
+
+    # Continue from whichever step of the form shows up first
+    step = await _first_attached(login_btn, email_label, email_input, timeout=10000)
+
+    # Step 1: Click "Войти" (Log in) button on the account type selection screen
+    if step == 0:
         log.info("Clicking 'Войти' button")
         await human_click_locator(page, login_btn)
-        await sleep_page_load()
+        step = 1 + await _first_attached(email_label, email_input, timeout=10000)
 
     # Step 2: Select "Почта" (Email) tab - click on the label text
-    email_label = page.locator("text=Почта").first
-    if await email_label.count() > 0:
+    if step == 1:
         log.info("Clicking email tab")
         await human_click_locator(page, email_label)
         await sleep_micro()
@@ -205,16 +407,6 @@ async def do_login_with_email(page: Page, email: str) -> None:
         log.debug("Email tab not found, assuming already on email form")
 
     # Step 3: Fill in email field
-    email_input = page.locator(
-        "[data-qa='applicant-login-input-email'], "
-        "[data-qa='login-input-username'], "
-        "[data-qa='magritte-input-email'], "
-        "input[type='email'], "
-        "input[name='username'], "
-        "input[name='login'], "
-        "input[placeholder*='почта'], "
-        "input[placeholder*='email']"
-    ).first
     await email_input.wait_for(state="visible", timeout=10000)
     
     # Clear field first (remove any autofilled/saved email)
@@ -228,27 +420,14 @@ async def do_login_with_email(page: Page, email: str) -> None:
     await sleep_micro()
 
     # Step 4: Click "Continue" button ("Дальше")
-    continue_btn = page.locator(
-        "[data-qa='account-login-submit'], "
-        "[data-qa='magritte-button-main-action'], "
-        "button[type='submit'], "
-        "button:has-text('Дальше'), "
-        "button:has-text('Продолжить')"
-    ).first
+    continue_btn = page.locator(CONTINUE_BUTTON_SELECTOR).first
     await continue_btn.wait_for(state="visible", timeout=5000)
     await human_click_locator(page, continue_btn)
     await sleep_after_submit()
 
     # Step 5: Wait for OTP/code input field
     log.info("Waiting for verification code field...")
-    code_input = page.locator(
-        "[data-qa='account-login-code-input'], "
-        "[data-qa='magritte-code-input'], "
-        "input[name='code'], "
-        "input[autocomplete='one-time-code'], "
-        "input[maxlength='6'], "
-        "input[placeholder*='код']"
-    ).first
+    code_input = page.locator(CODE_INPUT_SELECTOR).first
     try:
         await code_input.wait_for(state="visible", timeout=30000)
     except PatchrightTimeout:
@@ -257,7 +436,7 @@ async def do_login_with_email(page: Page, email: str) -> None:
 
     # Step 6: Prompt user for code
     print("\n" + "=" * 50)
-    code = input("Enter code from email: ").strip()
+    code = (await _ainput("Enter code from email: ")).strip()
     print("=" * 50 + "\n")
 
     if not code:
@@ -268,13 +447,7 @@ async def do_login_with_email(page: Page, email: str) -> None:
     await sleep_micro()
 
     # Step 7: Submit code
-    submit_btn = page.locator(
-        "[data-qa='account-login-code-submit'], "
-        "[data-qa='account-login-submit'], "
-        "button[type='submit'], "
-        "button:has-text('Подтвердить'), "
-        "button:has-text('Войти')"
-    ).first
+    submit_btn = page.locator(CODE_SUBMIT_SELECTOR).first
     if await submit_btn.count() > 0:
         await human_click_locator(page, submit_btn)
 
@@ -291,118 +464,29 @@ async def do_login_with_email(page: Page, email: str) -> None:
             raise RuntimeError(f"Login redirect did not happen. Current URL: {current}")
 
 
-async def do_login(page: Page) -> None:
+async def do_login(page: Page, known_login_state: bool | None = None) -> None:
     """Perform full email login flow with manual code entry (uses config email)."""
     cfg = get_config()
     email = cfg.auth.email
     if not email:
-        email = input("Enter your hh.ru email: ").strip()
+        email = (await _ainput("Enter your hh.ru email: ")).strip()
     
-    await do_login_with_email(page, email)
-
-    log.info("Navigating to login page")
-    await page.goto(LOGIN_URL, wait_until="domcontentloaded", timeout=20000)
-    await sleep_page_load()
-
-    # Step 1: Click "Войти" (Log in) button on the account type selection screen
-    login_btn = page.locator("button:has-text('Войти')").first
-    if await login_btn.count() > 0:
-        log.info("Clicking 'Войти' button")
-        await human_click_locator(page, login_btn)
-        await sleep_page_load()
-
-    # Step 2: Select "Почта" (Email) tab - click on the label text
-    email_label = page.locator("text=Почта").first
-    if await email_label.count() > 0:
-        log.info("Clicking email tab")
-        await human_click_locator(page, email_label)
-        await sleep_micro()
-    else:
-        log.debug("Email tab not found, assuming already on email form")
-
-    # Step 3: Fill in email field
-    email_input = page.locator(
-        "[data-qa='applicant-login-input-email'], "
-        "[data-qa='login-input-username'], "
-        "[data-qa='magritte-input-email'], "
-        "input[type='email'], "
-        "input[name='username'], "
-        "input[name='login'], "
-        "input[placeholder*='почта'], "
-        "input[placeholder*='email']"
-    ).first
-    await email_input.wait_for(state="visible", timeout=10000)
-    log.info("Typing email", email=email)
-    await human_type_locator(page, email_input, email)
-    await sleep_micro()
-
-    # Step 4: Click "Continue" button ("Дальше")
-    continue_btn = page.locator(
-        "[data-qa='account-login-submit'], "
-        "[data-qa='magritte-button-main-action'], "
-        "button[type='submit'], "
-        "button:has-text('Дальше'), "
-        "button:has-text('Продолжить')"
-    ).first
-    await continue_btn.wait_for(state="visible", timeout=5000)
-    await human_click_locator(page, continue_btn)
-    await sleep_after_submit()
-
-    # Step 5: Wait for OTP/code input field
-    log.info("Waiting for verification code field...")
-    code_input = page.locator(
-        "[data-qa='account-login-code-input'], "
-        "[data-qa='magritte-code-input'], "
-        "input[name='code'], "
-        "input[autocomplete='one-time-code'], "
-        "input[maxlength='6'], "
-        "input[placeholder*='код']"
-    ).first
-    try:
-        await code_input.wait_for(state="visible", timeout=30000)
-    except PatchrightTimeout:
-        log.warning("Code input not found after 30s - check browser manually")
-        raise RuntimeError("Verification code input did not appear. Check the browser window.")
-
-    # Step 6: Prompt user for code
-    print("\n" + "=" * 50)
-    code = input("Enter code from email: ").strip()
-    print("=" * 50 + "\n")
-
-    if not code:
-        raise RuntimeError("No verification code entered.")
-
-    log.info("Typing verification code")
-    await human_type_locator(page, code_input, code)
-    await sleep_micro()
-
-    # Step 7: Submit code
-    submit_btn = page.locator(
-        "[data-qa='account-login-code-submit'], "
-        "[data-qa='account-login-submit'], "
-        "button[type='submit'], "
-        "button:has-text('Подтвердить'), "
-        "button:has-text('Войти')"
-    ).first
-    if await submit_btn.count() > 0:
-        await human_click_locator(page, submit_btn)
-
-    log.info("Waiting for redirect after login...")
-    try:
-        await page.wait_for_url("**/applicant/**", timeout=30000)
-        log.info("Login successful", url=page.url)
-    except PatchrightTimeout:
-        # Some flows redirect to homepage
-        current = page.url
-        if "hh.ru" in current and "login" not in current:
-            log.info("Login appears successful", url=current)
-        else:
-            raise RuntimeError(f"Login redirect did not happen. Current URL: {current}")
+    await do_login_with_email(page, email, known_login_state)
 
 
 async def ensure_logged_in(page: Page) -> None:
     """Check login state; perform login if needed."""
-    if await is_logged_in(page):
+    # Verified a few minutes ago and the auth cookie is still there: load nothing
+    if _session_is_fresh() and await _has_auth_cookie(page):
+        log.info("Session verified recently, skipping login check")
+        return
+    # One HTTP request usually settles it; pages are opened only if it can't
+    logged_in = await _probe_auth(page)
+    if logged_in is None:
+        logged_in = await _check_applicant_page(page)
+    if logged_in:
+        _mark_session_verified()
         return
     log.info("Not logged in, starting login flow")
-    await do_login(page)
+    await do_login(page, known_login_state=False)
+    _mark_session_verified()
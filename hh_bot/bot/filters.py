@@ -1,7 +1,15 @@
 from __future__ import annotations
 
+import functools
 from dataclasses import dataclass
-from typing import Optional
+from typing import Optional, Tuple
+
+try:
+    import ahocorasick
+    HAS_AHOCORASICK = True
+except ImportError:
+    HAS_AHOCORASICK = False
+    ahocorasick = None  # type: ignore
 
 from hh_bot.bot.state import StateDB
 from hh_bot.scraper.search import VacancyCard
@@ -11,6 +19,9 @@ from hh_bot.utils.logger import get_logger
 
 log = get_logger(__name__)
 
+# Shorter blocklists are faster to check with plain `in` than with an automaton
+AUTOMATON_MIN_WORDS = 16
+
 
 @dataclass
 class FilterResult:
@@ -18,6 +29,32 @@ class FilterResult:
     reason: str = ""
 
 
+@functools.lru_cache(maxsize=4)
+def _automaton(words: Tuple[str, ...]) -> Optional["ahocorasick.Automaton"]:
+    """Aho-Corasick automaton over lowercased blocklist entries (index as payload)."""
+    if not HAS_AHOCORASICK or len(words) < AUTOMATON_MIN_WORDS:
+        return None
+    automaton = ahocorasick.Automaton()
+    for i, word in enumerate(words):
+        if word and word not in automaton:
+            automaton.add_word(word, i)
+    automaton.make_automaton()
+    return automaton
+
+
+def _first_blocked(words: Tuple[str, ...], text: str) -> int:
+    """Index of the first blocklist entry found in text, or -1."""
+    automaton = _automaton(words)
+    if automaton is None:
+        return next((i for i, word in enumerate(words) if word in text), -1)
+    # One pass over the text; the lowest index keeps the reason the loop would give.
+    # An empty entry matches any text, as with `in`.
+    found = min((i for _, i in automaton.iter(text)), default=len(words))
+    if "" in words:
+        found = min(found, words.index(""))
+    return found if found < len(words) else -1
+
+
 def quick_filter(card: VacancyCard, db: StateDB) -> FilterResult:
     """
     Fast pre-filters applied before opening the vacancy page.
@@ -30,16 +67,15 @@ def quick_filter(card: VacancyCard, db: StateDB) -> FilterResult:
         return FilterResult(skip=True, reason="already_seen")
 
     # Stop-word in title
-    title_lower = card.title.lower()
-    for kw in cfg.filters.blocked_keywords:
-        if kw.lower() in title_lower:
-            return FilterResult(skip=True, reason=f"blocked_keyword:{kw}")
+    filters = cfg.filters
+    i = _first_blocked(filters.blocked_keywords_lower, card.title_lower)
+    if i >= 0:
+        return FilterResult(skip=True, reason=f"blocked_keyword:{filters.blocked_keywords[i]}")
 
     # Blocked employer
-    employer_lower = card.employer.lower()
-    for emp in cfg.filters.blocked_employers:
-        if emp.lower() in employer_lower:
-            return FilterResult(skip=True, reason=f"blocked_employer:{emp}")
+    i = _first_blocked(filters.blocked_employers_lower, card.employer_lower)
+    if i >= 0:
+        return FilterResult(skip=True, reason=f"blocked_employer:{filters.blocked_employers[i]}")
 
     return FilterResult(skip=False)
 
@@ -1,17 +1,23 @@
 from __future__ import annotations
 
 import asyncio
+from collections import Counter
 from dataclasses import dataclass, field
-from typing import Optional
+from typing import List, Optional
 
 from patchright.async_api import Page
 
 from hh_bot.auth.login import ensure_logged_in
-from hh_bot.bot.filters import deep_filter, quick_filter
+from hh_bot.bot.filters import FilterResult, deep_filter, quick_filter
 from hh_bot.bot.state import StateDB
 from hh_bot.browser.human import random_micro_move
-from hh_bot.scraper.apply import apply_to_vacancy, ApplyError
-from hh_bot.scraper.resume_parser import fetch_resume_content, ResumeInfo, bump_resume_if_available
+from hh_bot.scraper.apply import apply_to_vacancy, apply_via_request, ApplyError
+from hh_bot.scraper.resume_parser import (
+    fetch_resume_content,
+    fetch_resume_hash,
+    ResumeInfo,
+    bump_resume_if_available,
+)
 from hh_bot.scraper.search import search_vacancies
 from hh_bot.scraper.vacancy import fetch_vacancy_details
 from hh_bot.utils.config import get_config
@@ -31,7 +37,7 @@ class SessionStats:
     applied: int = 0
     skipped: int = 0
     errors: int = 0
-    skip_reasons: dict = field(default_factory=dict)
+    skip_reasons: Counter = field(default_factory=Counter)
 
 
 async def run_session(page: Page, query: str, db: StateDB) -> SessionStats:
@@ -68,6 +74,16 @@ async def run_session(page: Page, query: str, db: StateDB) -> SessionStats:
     except Exception as e:
         log.warning("Failed to bump resume", error=str(e))
 
+    # Request-based applies need the resume id; the bump left us on the resumes list
+    resume_hash = ""
+    if cfg.apply.api_fast_path and not cfg.cover_letter.enabled:
+        try:
+            resume_hash = await fetch_resume_hash(page, preferred_resume)
+        except Exception as e:
+            log.warning("Failed to get resume id", error=str(e))
+        if not resume_hash:
+            log.warning("Resume id not found, applying through the form only")
+
     # Determine which area IDs to use
     if cfg.search.area_ids:
         area_ids = cfg.search.area_ids
@@ -84,118 +100,193 @@ async def run_session(page: Page, query: str, db: StateDB) -> SessionStats:
         max_apps=max_apps,
     )
 
-    # 2. Iterate search pages
-    for page_num in range(cfg.search.max_pages):
-        if stats.applied >= max_apps:
-            log.info("Reached max applications limit", limit=max_apps)
-            break
+    # Extra tabs in the same (logged-in) context, each working a card at a time
+    workers = max(cfg.limits.parallel_pages, 1)
+    tabs = [page] + [await page.context.new_page() for _ in range(workers - 1)]
+    free_tabs: asyncio.Queue = asyncio.Queue()
+    for tab in tabs:
+        free_tabs.put_nowait(tab)
+    applying = 0  # Applications in flight, counted against max_apps
+    # Search results on their own tab, so the next page loads while cards are processed
+    search_tab = await page.context.new_page() if cfg.search.prefetch_next_page else page
+    next_cards: Optional[asyncio.Task] = None
+
+    def count_skip(reason: str) -> None:
+        stats.skipped += 1
+        stats.skip_reasons[reason] += 1
+
+    async def process_card(tab: Page, card) -> None:
+        nonlocal applying
+        if stats.applied + applying >= max_apps:
+            return
+
+        # Open vacancy page
+        try:
+            details = await fetch_vacancy_details(tab, card.url, card.vacancy_id)
+        except Exception as e:
+            log.warning("Failed to fetch vacancy details", id=card.vacancy_id, error=str(e))
+            stats.errors += 1
+            return
+
+        # Check if already applied (no apply button on page)
+        if details.already_applied:
+            log.info(
+                "Skipping - already applied",
+                id=card.vacancy_id,
+                title=details.title,
+            )
+            count_skip("already_applied")
+            db.mark_skipped(
+                card.vacancy_id, details.title, details.employer, card.url, "already_applied"
+            )
+            return
+
+        # Deep filter (after page open)
+        df = deep_filter(details)
+        if df.skip:
+            log.info(
+                "Deep-filtered",
+                id=card.vacancy_id,
+                title=details.title,
+                reason=df.reason,
+            )
+            count_skip(df.reason)
+            db.mark_skipped(
+                card.vacancy_id, details.title, details.employer, card.url, df.reason
+            )
+            return
+
+        if stats.applied + applying >= max_apps:
+            return
+
+        # Apply
+        applying += 1
+        try:
+            log.info(
+                "Applying",
+                id=card.vacancy_id,
+                title=details.title,
+                employer=details.employer,
+            )
+            success = False
+            if resume_hash and not (
+                details.has_test or details.response_letter_required or details.is_external
+            ):
+                success = await apply_via_request(tab, details, resume_hash)
+            if not success:
+                success = await apply_to_vacancy(tab, details, preferred_resume, resume_info)
+        except ApplyError as e:
+            log.error("Apply error", id=card.vacancy_id, error=str(e))
+            stats.errors += 1
+            return
+        except Exception as e:
+            log.error("Unexpected apply error", id=card.vacancy_id, error=str(e))
+            stats.errors += 1
+            return
+        finally:
+            applying -= 1
+
+        if success:
+            db.mark_applied(card.vacancy_id, details.title, details.employer, card.url)
+            stats.applied += 1
+
+            # Coffee break every 5 applications
+            if stats.applied % 5 == 0:
+                log.info("Taking coffee break", applied_so_far=stats.applied)
+                await sleep_coffee_break()
+            else:
+                await sleep_between_applications(
+                    cfg.limits.min_delay_between_applications,
+                    cfg.limits.max_delay_between_applications,
+                )
 
-        cards = await search_vacancies(page, query, area_ids, page_num)
-        if not cards:
-            log.info("No more vacancies found", page=page_num)
-            break
+            # Random micro-movements between applications
+            await random_micro_move(tab, count=2)
+        else:
+            count_skip("apply_failed")
+
+    async def run_on_tab(tab: Page, card) -> None:
+        try:
+            await process_card(tab, card)
+        finally:
+            free_tabs.put_nowait(tab)
 
-        # 3. Process each card
-        for card in cards:
+    card_tasks: List[asyncio.Task] = []
+
+    try:
+        # 2. Iterate search pages
+        for page_num in range(cfg.search.max_pages):
             if stats.applied >= max_apps:
+                log.info("Reached max applications limit", limit=max_apps)
                 break
 
-            # Quick filter (no page open needed)
-            qf = quick_filter(card, db)
-            if qf.skip:
-                log.debug("Quick-filtered", id=card.vacancy_id, reason=qf.reason)
-                stats.skipped += 1
-                stats.skip_reasons[qf.reason] = stats.skip_reasons.get(qf.reason, 0) + 1
-                if qf.reason != "already_seen":
-                    db.mark_skipped(
-                        card.vacancy_id, card.title, card.employer, card.url, qf.reason
-                    )
-                continue
-
-            # Open vacancy page
-            try:
-                details = await fetch_vacancy_details(page, card.url, card.vacancy_id)
-            except Exception as e:
-                log.warning("Failed to fetch vacancy details", id=card.vacancy_id, error=str(e))
-                stats.errors += 1
-                continue
-
-            # Check if already applied (no apply button on page)
-            if details.already_applied:
-                log.info(
-                    "Skipping - already applied",
-                    id=card.vacancy_id,
-                    title=details.title,
-                )
-                stats.skipped += 1
-                stats.skip_reasons["already_applied"] = stats.skip_reasons.get("already_applied", 0) + 1
-                db.mark_skipped(
-                    card.vacancy_id, details.title, details.employer, card.url, "already_applied"
-                )
-                continue
-
-            # Deep filter (after page open)
-            df = deep_filter(details)
-            if df.skip:
-                log.info(
-                    "Deep-filtered",
-                    id=card.vacancy_id,
-                    title=details.title,
-                    reason=df.reason,
-                )
-                stats.skipped += 1
-                stats.skip_reasons[df.reason] = stats.skip_reasons.get(df.reason, 0) + 1
-                db.mark_skipped(
-                    card.vacancy_id, details.title, details.employer, card.url, df.reason
-                )
-                continue
-
-            # Apply
-            try:
-                log.info(
-                    "Applying",
-                    id=card.vacancy_id,
-                    title=details.title,
-                    employer=details.employer,
+            if next_cards is not None:
+                cards = await next_cards
+                next_cards = None
+            else:
+                cards = await search_vacancies(search_tab, query, area_ids, page_num)
+            if not cards:
+                log.info("No more vacancies found", page=page_num)
+                break
+            if search_tab is not page and page_num + 1 < cfg.search.max_pages:
+                next_cards = asyncio.create_task(
+                    search_vacancies(search_tab, query, area_ids, page_num + 1)
                 )
-                success = await apply_to_vacancy(page, details, preferred_resume, resume_info)
-            except ApplyError as e:
-                log.error("Apply error", id=card.vacancy_id, error=str(e))
-                stats.errors += 1
-                continue
-            except Exception as e:
-                log.error("Unexpected apply error", id=card.vacancy_id, error=str(e))
-                stats.errors += 1
-                continue
-
-            if success:
-                db.mark_applied(card.vacancy_id, details.title, details.employer, card.url)
-                stats.applied += 1
-
-                # Coffee break every 5 applications
-                if stats.applied % 5 == 0:
-                    log.info("Taking coffee break", applied_so_far=stats.applied)
-                    await sleep_coffee_break()
+
+            # 3. Quick filter (no page open needed), then process the card on a free tab
+            pending_skips = []
+            # Skips are marked at the end of the page, so repeats are caught here
+            page_ids = set()
+            card_tasks = []
+            for card in cards:
+                # A tab is taken before filtering: with one tab this is the plain serial loop
+                tab = await free_tabs.get()
+                if stats.applied + applying >= max_apps:
+                    free_tabs.put_nowait(tab)
+                    break
+
+                if card.vacancy_id in page_ids:
+                    qf = FilterResult(skip=True, reason="already_seen")
                 else:
-                    await sleep_between_applications(
-                        cfg.limits.min_delay_between_applications,
-                        cfg.limits.max_delay_between_applications,
-                    )
+                    page_ids.add(card.vacancy_id)
+                    qf = quick_filter(card, db)
+                if qf.skip:
+                    free_tabs.put_nowait(tab)
+                    log.debug("Quick-filtered", id=card.vacancy_id, reason=qf.reason)
+                    count_skip(qf.reason)
+                    if qf.reason != "already_seen":
+                        pending_skips.append(
+                            (card.vacancy_id, card.title, card.employer, card.url, qf.reason)
+                        )
+                    continue
 
-                # Random micro-movements between applications
-                await random_micro_move(page, count=2)
-            else:
-                stats.skipped += 1
-                stats.skip_reasons["apply_failed"] = stats.skip_reasons.get("apply_failed", 0) + 1
+                card_tasks.append(asyncio.create_task(run_on_tab(tab, card)))
+
+            results = await asyncio.gather(*card_tasks, return_exceptions=True)
+            for card_result in results:
+                if isinstance(card_result, Exception):
+                    log.error("Card processing failed", error=str(card_result))
+                    stats.errors += 1
+            # One statement for the page's quick-filter skips
+            db.mark_skipped_batch(pending_skips)
 
-        # Brief pause between pages
-        await asyncio.sleep(2.0)
+            # Brief pause between pages
+            await asyncio.sleep(2.0)
+    finally:
+        for task in card_tasks:
+            task.cancel()
+        if next_cards is not None:
+            next_cards.cancel()
+        for tab in tabs[1:]:
+            await tab.close()
+        if search_tab is not page:
+            await search_tab.close()
 
     log.info(
         "Session complete",
         applied=stats.applied,
         skipped=stats.skipped,
         errors=stats.errors,
-        reasons=stats.skip_reasons,
+        reasons=dict(stats.skip_reasons),
     )
     return stats
@@ -3,13 +3,16 @@ from __future__ import annotations
 import sqlite3
 from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import Iterable, Optional, Set, Tuple
 
 from hh_bot.utils.logger import get_logger
 
 log = get_logger(__name__)
 
 DEFAULT_DB_PATH = "./data/applied.db"
+# Skip marks are committed in batches of this size, and on flush()/close();
+# applications are committed right away
+FLUSH_EVERY = 5
 
 
 class StateDB:
@@ -18,8 +21,16 @@ class StateDB:
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
         self._conn = sqlite3.connect(str(self.db_path))
         self._init_schema()
+        # Applied + skipped ids, loaded on first has_seen() and kept in sync
+        self._seen: Optional[Set[str]] = None
+        self._pending = 0
 
     def _init_schema(self) -> None:
+        # WAL + NORMAL: commits no longer fsync, only checkpoints do
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA temp_store=MEMORY")
+        self._conn.execute("PRAGMA cache_size=-8000")
         self._conn.execute("""
             CREATE TABLE IF NOT EXISTS applied_vacancies (
                 vacancy_id   TEXT PRIMARY KEY,
@@ -48,14 +59,23 @@ class StateDB:
         )
         return cur.fetchone() is not None
 
+    def load_seen_ids(self) -> Set[str]:
+        """All applied and skipped vacancy ids, in one query."""
+        rows = self._conn.execute(
+            "SELECT vacancy_id FROM applied_vacancies "
+            "UNION ALL SELECT vacancy_id FROM skipped_vacancies"
+        ).fetchall()
+        return {r[0] for r in rows}
+
     def has_seen(self, vacancy_id: str) -> bool:
-        """Return True if vacancy was already applied or skipped."""
-        if self.has_applied(vacancy_id):
-            return True
-        cur = self._conn.execute(
-            "SELECT 1 FROM skipped_vacancies WHERE vacancy_id = ?", (vacancy_id,)
-        )
-        return cur.fetchone() is not None
+        """Return True if vacancy was already applied or skipped.
+
+        Answered from memory: search pages are checked card by card.
+        """
+        if self._seen is None:
+            self._seen = self.load_seen_ids()
+            log.debug("Loaded seen vacancies", count=len(self._seen))
+        return vacancy_id in self._seen
 
     def mark_applied(
         self,
@@ -72,7 +92,12 @@ class StateDB:
             """,
             (vacancy_id, title, employer, url, datetime.utcnow().isoformat()),
         )
-        self._conn.commit()
+        # A crash must not lose an application that was sent: commit it now,
+        # along with any pending skips
+        self._pending += 1
+        self.flush()
+        if self._seen is not None:
+            self._seen.add(vacancy_id)
         log.info("Marked as applied", vacancy_id=vacancy_id, title=title)
 
     def mark_skipped(
@@ -91,9 +116,47 @@ class StateDB:
             """,
             (vacancy_id, title, employer, url, datetime.utcnow().isoformat(), reason),
         )
-        self._conn.commit()
+        self._written()
+        if self._seen is not None:
+            self._seen.add(vacancy_id)
         log.debug("Marked as skipped", vacancy_id=vacancy_id, reason=reason)
 
+    def mark_skipped_batch(self, rows: Iterable[Tuple[str, str, str, str, str]]) -> None:
+        """Mark many vacancies as skipped in one statement and one commit.
+
+        Each row is ``(vacancy_id, title, employer, url, reason)``. Ids that
+        are already marked keep their first reason.
+        """
+        now = datetime.utcnow().isoformat()
+        rows = [(vid, title, employer, url, now, reason) for vid, title, employer, url, reason in rows]
+        if not rows:
+            return
+        self._conn.executemany(
+            """
+            INSERT OR IGNORE INTO skipped_vacancies
+                (vacancy_id, title, employer, url, skipped_at, reason)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            rows,
+        )
+        self._pending += len(rows)
+        self.flush()
+        if self._seen is not None:
+            self._seen.update(r[0] for r in rows)
+        log.debug("Marked as skipped", count=len(rows))
+
+    def _written(self) -> None:
+        """Count an uncommitted write; commit once FLUSH_EVERY have piled up."""
+        self._pending += 1
+        if self._pending >= FLUSH_EVERY:
+            self.flush()
+
+    def flush(self) -> None:
+        """Commit pending marks."""
+        if self._pending:
+            self._conn.commit()
+            self._pending = 0
+
     def get_stats(self) -> dict:
         applied = self._conn.execute("SELECT COUNT(*) FROM applied_vacancies").fetchone()[0]
         skipped = self._conn.execute("SELECT COUNT(*) FROM skipped_vacancies").fetchone()[0]
@@ -114,7 +177,10 @@ class StateDB:
         self._conn.execute("DELETE FROM applied_vacancies")
         self._conn.execute("DELETE FROM skipped_vacancies")
         self._conn.commit()
+        self._pending = 0
+        self._seen = None
         log.info("State cleared")
 
     def close(self) -> None:
+        self.flush()
         self._conn.close()
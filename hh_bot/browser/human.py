@@ -3,7 +3,7 @@ from __future__ import annotations
 import asyncio
 import random
 import math
-from typing import Tuple
+from typing import List, Tuple
 
 from patchright.async_api import Page, Locator
 
@@ -11,31 +11,53 @@ from hh_bot.utils.delays import (
     sleep_typing,
     sleep_before_click,
     sleep_micro,
+    human_delay,
     uniform_delay,
     gauss_delay,
 )
+from hh_bot.utils.config import get_config
 from hh_bot.utils.logger import get_logger
 
 log = get_logger(__name__)
 
+# Bezier waypoints are joined by short straight segments that Playwright
+# interpolates on its side, so a click costs a few round-trips instead of ~25
+SEGMENT_STEPS = 4
 
-def _bezier_point(
-    t: float,
+
+def _bezier_path(
     p0: Tuple[float, float],
     p1: Tuple[float, float],
     p2: Tuple[float, float],
     p3: Tuple[float, float],
-) -> Tuple[float, float]:
-    """Cubic Bezier interpolation."""
-    mt = 1 - t
-    x = mt**3 * p0[0] + 3 * mt**2 * t * p1[0] + 3 * mt * t**2 * p2[0] + t**3 * p3[0]
-    y = mt**3 * p0[1] + 3 * mt**2 * t * p1[1] + 3 * mt * t**2 * p2[1] + t**3 * p3[1]
-    return x, y
+    steps: int,
+) -> List[Tuple[float, float]]:
+    """Points of a cubic Bezier curve at t = 0, 1/steps, ..., 1.
+
+    The curve is converted to power form once (a*t^3 + b*t^2 + c*t + d),
+    then each point is a Horner evaluation.
+    """
+    coeffs = []
+    for k in (0, 1):
+        d = p0[k]
+        c = 3 * (p1[k] - p0[k])
+        b = 3 * (p2[k] - 2 * p1[k] + p0[k])
+        a = p3[k] - 3 * p2[k] + 3 * p1[k] - p0[k]
+        coeffs.append((a, b, c, d))
+    (ax, bx, cx, dx), (ay, by, cy, dy) = coeffs
+    ts = [i / steps for i in range(steps + 1)]
+    return [
+        (((ax * t + bx) * t + cx) * t + dx, ((ay * t + by) * t + cy) * t + dy)
+        for t in ts
+    ]
 
 
 async def human_type(page: Page, selector: str, text: str) -> None:
     """Type text into a field with human-like behavior."""
     element = page.locator(selector).first
+    if not get_config().human.enabled:
+        await element.fill(text)
+        return
     await element.scroll_into_view_if_needed()
     await element.click()
     await sleep_micro()
@@ -55,6 +77,9 @@ async def human_type_locator(page: Page, locator: Locator, text: str) -> None:
     2. No lost characters when user clicks outside the browser
     3. Fast, reliable operation (no character-by-character delays that can fail)
     """
+    if not get_config().human.enabled:
+        await locator.fill(text)
+        return
     # Ensure element is visible and focused
     await locator.scroll_into_view_if_needed()
     await locator.click()
@@ -79,6 +104,9 @@ async def human_click_locator(page: Page, locator: Locator) -> None:
 
 async def _bezier_move_and_click(page: Page, locator: Locator) -> None:
     """Move mouse along a Bezier curve to element, then click."""
+    if not get_config().human.enabled:
+        await locator.click()
+        return
     try:
         box = await locator.bounding_box()
     except Exception:
@@ -109,11 +137,18 @@ async def _bezier_move_and_click(page: Page, locator: Locator) -> None:
     )
 
     steps = random.randint(18, 32)
-    for i in range(steps + 1):
-        t = i / steps
-        x, y = _bezier_point(t, (start_x, start_y), cp1, cp2, (target_x, target_y))
-        await page.mouse.move(x, y)
-        await asyncio.sleep(uniform_delay(0.005, 0.02))
+    path = _bezier_path((start_x, start_y), cp1, cp2, (target_x, target_y), steps // SEGMENT_STEPS)
+    # Paced by the clock: time spent in mouse.move itself counts toward the
+    # pause before the next segment instead of adding to it
+    loop = asyncio.get_running_loop()
+    due = loop.time()
+    await page.mouse.move(*path[0])
+    for x, y in path[1:]:
+        await page.mouse.move(x, y, steps=SEGMENT_STEPS)
+        due += human_delay(0.005, 0.02) * SEGMENT_STEPS
+        delay = due - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
 
     await sleep_before_click()
     await page.mouse.click(target_x, target_y)
@@ -122,15 +157,20 @@ async def _bezier_move_and_click(page: Page, locator: Locator) -> None:
 
 async def human_scroll(page: Page, distance: int = 400) -> None:
     """Scroll the page smoothly, simulating reading."""
+    if not get_config().human.enabled:
+        await page.mouse.wheel(0, distance)
+        return
     steps = random.randint(8, 16)
     per_step = distance / steps
     for _ in range(steps):
         await page.mouse.wheel(0, per_step)
-        await asyncio.sleep(uniform_delay(0.05, 0.15))
+        await asyncio.sleep(human_delay(0.05, 0.15))
 
 
 async def random_micro_move(page: Page, count: int = 2) -> None:
     """Perform 1-3 small random mouse movements without clicking."""
+    if not get_config().human.enabled:
+        return
     vp = page.viewport_size or {"width": 1280, "height": 800}
     for _ in range(count):
         x = random.uniform(vp["width"] * 0.1, vp["width"] * 0.9)
@@ -3,7 +3,7 @@ from __future__ import annotations
 import socket
 from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Optional
 
 from patchright.async_api import async_playwright, BrowserContext, Page
 
@@ -39,9 +39,17 @@ async def _mask_webdriver(page: Page) -> None:
 
 
 @asynccontextmanager
-async def launch_browser() -> AsyncGenerator[tuple[BrowserContext, Page], None]:
-    """Launch persistent Chrome browser context via Patchright."""
+async def launch_browser(
+    headless: Optional[bool] = None,
+) -> AsyncGenerator[tuple[BrowserContext, Page], None]:
+    """Launch persistent Chrome browser context via Patchright.
+
+    Cookies and local storage live in ``browser.profile_dir``, so a login
+    survives between runs. ``headless`` overrides ``browser.headless``.
+    """
     cfg = get_config()
+    if headless is None:
+        headless = cfg.browser.headless
     profile_dir = Path(cfg.browser.profile_dir).resolve()
     profile_dir.mkdir(parents=True, exist_ok=True)
 
@@ -55,12 +63,12 @@ async def launch_browser() -> AsyncGenerator[tuple[BrowserContext, Page], None]:
     if resolver_rules:
         args.append(f"--host-resolver-rules={resolver_rules}")
 
-    log.info("Launching browser", profile=str(profile_dir), headless=cfg.browser.headless)
+    log.info("Launching browser", profile=str(profile_dir), headless=headless)
 
     async with async_playwright() as pw:
         context = await pw.chromium.launch_persistent_context(
             user_data_dir=str(profile_dir),
-            headless=cfg.browser.headless,
+            headless=headless,
             args=args,
             ignore_default_args=["--enable-automation"],
             viewport={"width": 1280, "height": 800},
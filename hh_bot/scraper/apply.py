@@ -19,10 +19,62 @@ from hh_bot.utils.logger import get_logger
 log = get_logger(__name__)
 
 
+VACANCY_RESPONSE_URL = "https://hh.ru/applicant/vacancy_response/popup"
+
+
 class ApplyError(Exception):
     pass
 
 
+async def apply_via_request(page: Page, details: VacancyDetails, resume_hash: str) -> bool:
+    """Submit a response with one POST through the browser's cookies, no clicks.
+    
+    Only for vacancies that need neither a test nor a cover letter. Returns
+    False on anything unexpected, so the caller can fall back to the form.
+    """
+    cookies = await page.context.cookies("https://hh.ru")
+    xsrf = next((c["value"] for c in cookies if c["name"] == "_xsrf"), "")
+    if not xsrf:
+        log.debug("No _xsrf cookie, using the form", vacancy_id=details.vacancy_id)
+        return False
+    
+    try:
+        response = await page.request.post(
+            VACANCY_RESPONSE_URL,
+            form={
+                "_xsrf": xsrf,
+                "vacancy_id": details.vacancy_id,
+                "resume_hash": resume_hash,
+                "ignore_postponed": "true",
+                "incomplete": "false",
+                "letter": "",
+                "lux": "true",
+                "withoutTest": "no",
+            },
+            headers={
+                "X-Xsrftoken": xsrf,
+                "X-Requested-With": "XMLHttpRequest",
+                "Referer": details.url,
+            },
+            timeout=20000,
+        )
+        data = await response.json() if response.ok else {}
+    except Exception as e:
+        log.warning("Request apply failed, using the form", vacancy_id=details.vacancy_id, error=str(e))
+        return False
+    
+    if isinstance(data, dict) and str(data.get("success")).lower() == "true":
+        log.info("Applied via request", vacancy_id=details.vacancy_id)
+        return True
+    log.warning(
+        "Request apply not accepted, using the form",
+        vacancy_id=details.vacancy_id,
+        status=response.status,
+        error=data.get("error") if isinstance(data, dict) else None,
+    )
+    return False
+
+
 async def apply_to_vacancy(
     page: Page,
     details: VacancyDetails,
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import asyncio
+import re
 from dataclasses import dataclass
 from typing import Optional
 
@@ -11,6 +12,9 @@ from hh_bot.utils.logger import get_logger
 
 log = get_logger(__name__)
 
+RESUMES_URL = "https://hh.ru/applicant/resumes"
+_RESUME_HASH_RE = re.compile(r"/resume/([0-9a-f]{16,})")
+
 
 @dataclass
 class ResumeInfo:
@@ -54,6 +58,25 @@ async def fetch_resume_content(page: Page, resume_url: Optional[str] = None) ->
     return info
 
 
+async def fetch_resume_hash(page: Page, preferred_title: str = "") -> str:
+    """Id (hash) of the resume to apply with, from the resumes list.
+    
+    Uses the current page if it already is the resumes list. Empty if no
+    resume matches ``preferred_title`` (or there are none).
+    """
+    if not page.url.startswith(RESUMES_URL):
+        await page.goto(RESUMES_URL, wait_until="domcontentloaded", timeout=20000)
+        await sleep_page_load()
+    
+    links = page.locator("a[href*='/resume/']")
+    if preferred_title:
+        links = links.filter(has_text=preferred_title)
+    if await links.count() == 0:
+        return ""
+    match = _RESUME_HASH_RE.search(await links.first.get_attribute("href") or "")
+    return match.group(1) if match else ""
+
+
 async def bump_resume_if_available(page: Page) -> bool:
     """
     Click 'Поднять в поиске' (bump resume) button if available on the resumes page.
@@ -91,7 +114,7 @@ async def bump_resume_if_available(page: Page) -> bool:
         log.info("✅ Resume bumped successfully!")
         return True
     except Exception as e:
-        log.warning(f"Failed to click bump button: {e}")
+        log.warning("Failed to click bump button", error=str(e))
         return False
 
 
@@ -171,27 +194,33 @@ async def generate_cover_letter(
     
     cfg = get_config()
     
-    log.info("=== GENERATE_COVER_LETTER DEBUG ===")
-    log.info(f"use_ai_cover_letter: {cfg.use_ai_cover_letter}")
-    log.info(f"cover_letter.enabled: {cfg.cover_letter.enabled}")
-    log.info(f"cover_letter.ai.enabled: {cfg.cover_letter.ai.enabled}")
+    log.debug(
+        "generate_cover_letter",
+        use_ai=cfg.use_ai_cover_letter,
+        cover_letter_enabled=cfg.cover_letter.enabled,
+        ai_enabled=cfg.cover_letter.ai.enabled,
+    )
     
     # Try AI generation if enabled
     if cfg.use_ai_cover_letter:
-        log.info("AI generation is enabled, trying...")
+        log.debug("AI generation is enabled, trying...")
         from hh_bot.ai_generator.models import AIGeneratorConfig
         from hh_bot.scraper.vacancy import VacancyDetails
         
         ai_config = AIGeneratorConfig(
             enabled=cfg.cover_letter.ai.enabled,
+            provider=cfg.cover_letter.ai.provider,
+            race_providers=cfg.cover_letter.ai.race_providers,
             api_key=cfg.cover_letter.ai.api_key,
             model=cfg.cover_letter.ai.model,
             max_tokens=cfg.cover_letter.ai.max_tokens,
             temperature=cfg.cover_letter.ai.temperature,
             custom_prompt=cfg.cover_letter.ai.custom_prompt or None,
+            cache_enabled=cfg.cover_letter.ai.cache_enabled,
+            http_cache_ttl=cfg.cover_letter.ai.http_cache_ttl,
         )
         
-        log.info(f"AI config: model={ai_config.model}, api_key={'***' if ai_config.api_key else '(none)'}")
+        log.debug("AI config", model=ai_config.model, api_key=bool(ai_config.api_key))
         
         # Create minimal vacancy details for AI
         vacancy = VacancyDetails(
@@ -202,18 +231,18 @@ async def generate_cover_letter(
             description=vacancy_description or "",
         )
         
-        log.info("Calling generate_ai_cover_letter...")
+        log.debug("Calling generate_ai_cover_letter...")
         ai_letter = await generate_ai_cover_letter(
             resume=resume,
             vacancy=vacancy,
             vacancy_description=vacancy_description,
             config=ai_config,
             telegram=cfg.auth.telegram,
-            author_name=cfg.auth.name or cfg.auth.email.split('@')[0] if cfg.auth.email else None,
+            author_name=cfg.auth.name or (cfg.auth.email.split('@')[0] if cfg.auth.email else None),
         )
         
         if ai_letter:
-            log.info(f"✅ AI generated letter: {len(ai_letter)} chars")
+            log.info("✅ AI generated letter", chars=len(ai_letter))
             return ai_letter
         
         log.warning("⚠️  AI generation returned None, using fallback")
@@ -221,13 +250,13 @@ async def generate_cover_letter(
         log.info("AI generation disabled, using fallback")
     
     # Fallback to template-based generation
-    log.info("Generating fallback cover letter...")
+    log.debug("Generating fallback cover letter...")
     letter = generate_fallback_cover_letter(resume, vacancy_title, company_name, vacancy_description)
-    log.info(f"Fallback letter generated: {len(letter)} chars")
+    log.info("Fallback letter generated", chars=len(letter))
     
     # Add contacts to fallback letter
-    from hh_bot.ai_generator.groq_generator import _ensure_contacts
-    letter = _ensure_contacts(letter, cfg.auth.telegram, cfg.auth.name or cfg.auth.email.split('@')[0] if cfg.auth.email else None)
+    from hh_bot.ai_generator.cleaning import ensure_contacts
+    letter = ensure_contacts(letter, cfg.auth.telegram, cfg.auth.name or (cfg.auth.email.split('@')[0] if cfg.auth.email else None))
     return letter
 
 
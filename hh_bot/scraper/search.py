@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import asyncio
 from dataclasses import dataclass, field
+from functools import cached_property
 from typing import List, Optional
 from urllib.parse import urlencode
 
@@ -24,6 +25,15 @@ class VacancyCard:
     url: str
     has_quick_response: bool = False
 
+    # Lowercased once per card and shared by all blocklist checks
+    @cached_property
+    def title_lower(self) -> str:
+        return self.title.lower()
+
+    @cached_property
+    def employer_lower(self) -> str:
+        return self.employer.lower()
+
 
 async def search_vacancies(
     page: Page,
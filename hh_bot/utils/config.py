@@ -1,8 +1,9 @@
 from __future__ import annotations
 
 import os
+from functools import cached_property
 from pathlib import Path
-from typing import List, Optional, Union
+from typing import List, Optional, Tuple, Union
 
 import yaml
 from pydantic import BaseModel, field_validator, model_validator
@@ -28,6 +29,7 @@ class SearchConfig(BaseModel):
     # Search field: "name" (title only), "description", "company_name", or empty (all fields)
     # Empty/default = search everywhere (like website), gives more results
     search_field: str = ""  # "name", "description", "company_name", or "" for all
+    prefetch_next_page: bool = False  # Грузить следующую страницу поиска в отдельной вкладке заранее
     
     @field_validator('area_ids', mode='before')
     @classmethod
@@ -60,6 +62,7 @@ class LimitsConfig(BaseModel):
     max_applications_per_session: int = 20
     min_delay_between_applications: int = 10
     max_delay_between_applications: int = 30
+    parallel_pages: int = 1  # Сколько вкладок обрабатывают вакансии одновременно (1 - по очереди)
 
 
 class FiltersConfig(BaseModel):
@@ -67,15 +70,31 @@ class FiltersConfig(BaseModel):
     skip_direct_vacancies: bool = True
     blocked_keywords: List[str] = []
     blocked_employers: List[str] = []
+    
+    # Lowercased once per config, not for every search card
+    @cached_property
+    def blocked_keywords_lower(self) -> Tuple[str, ...]:
+        return tuple(kw.lower() for kw in self.blocked_keywords)
+    
+    @cached_property
+    def blocked_employers_lower(self) -> Tuple[str, ...]:
+        return tuple(emp.lower() for emp in self.blocked_employers)
 
 
 class AIGeneratorConfig(BaseModel):
     enabled: bool = False  # Использовать AI для генерации писем
+    provider: str = "auto"  # openrouter, groq или auto (попробовать все)
+    race_providers: bool = False  # auto: запрашивать OpenRouter и Groq одновременно, брать первый ответ
     api_key: str = ""  # OpenRouter API ключ (опционально)
     model: str = "deepseek/deepseek-chat:free"  # Модель (бесплатные: deepseek/deepseek-chat:free, mistralai/mistral-7b-instruct:free)
     max_tokens: int = 500
     temperature: float = 0.7
     custom_prompt: str = ""  # Кастомный системный промпт (опционально)
+    cache_enabled: bool = True  # Кэшировать сгенерированные письма (./data/letter_cache.db)
+    # Сколько хранить ответы API на одинаковые запросы, сек (0 - не хранить).
+    # Кэшируются только запросы с temperature <= 0.3: Groq (всегда 0.3), а OpenRouter -
+    # только если снизить temperature (при 0.7 по умолчанию кэш для него не работает)
+    http_cache_ttl: int = 86400
 
 
 class CoverLetterConfig(BaseModel):
@@ -92,6 +111,22 @@ class ResumeConfig(BaseModel):
     preferred_title: str = ""
 
 
+class ApplyConfig(BaseModel):
+    # Экспериментально: отклик одним POST-запросом без кликов (только без теста и письма)
+    api_fast_path: bool = False
+
+
+class HumanConfig(BaseModel):
+    enabled: bool = True  # Движения мыши по кривой, плавная прокрутка, случайные движения (false - для отладки/CI)
+    speed: Optional[float] = None  # Множитель "человеческих" пауз (по умолчанию 1.0, при enabled: false - 0.3)
+
+    @property
+    def delay_scale(self) -> float:
+        if self.speed is not None:
+            return self.speed
+        return 1.0 if self.enabled else 0.3
+
+
 class Config(BaseModel):
     auth: AuthConfig = AuthConfig()
     browser: BrowserConfig = BrowserConfig()
@@ -100,6 +135,8 @@ class Config(BaseModel):
     filters: FiltersConfig = FiltersConfig()
     cover_letter: CoverLetterConfig = CoverLetterConfig()
     resume: ResumeConfig = ResumeConfig()
+    apply: ApplyConfig = ApplyConfig()
+    human: HumanConfig = HumanConfig()
     
     @property
     def use_ai_cover_letter(self) -> bool:
@@ -4,6 +4,8 @@ import asyncio
 import random
 import math
 
+from hh_bot.utils.config import get_config
+
 
 def clamp(value: float, lo: float, hi: float) -> float:
     return max(lo, min(hi, value))
@@ -18,6 +20,11 @@ def uniform_delay(lo: float, hi: float) -> float:
     return random.uniform(lo, hi)
 
 
+def human_delay(lo: float, hi: float) -> float:
+    """uniform_delay scaled by the human.speed setting."""
+    return uniform_delay(lo, hi) * get_config().human.delay_scale
+
+
 async def sleep_between_applications(min_s: float, max_s: float) -> None:
     """Delay between job applications using Gaussian distribution."""
     mean = (min_s + max_s) / 2
@@ -34,22 +41,23 @@ async def sleep_coffee_break() -> None:
 
 async def sleep_typing(char_index: int) -> None:
     """Per-character typing delay with occasional 'thinking' pauses."""
-    base = gauss_delay(130, 30, 80, 220) / 1000  # 80-220ms
+    scale = get_config().human.delay_scale
+    base = gauss_delay(130, 30, 80, 220) / 1000 * scale  # 80-220ms
     await asyncio.sleep(base)
     # Pause every ~5 characters
     if char_index > 0 and char_index % 5 == 0:
-        pause = uniform_delay(0.3, 0.8)
+        pause = uniform_delay(0.3, 0.8) * scale
         await asyncio.sleep(pause)
 
 
 async def sleep_before_click() -> None:
     """Brief drift before clicking (100-400ms)."""
-    await asyncio.sleep(uniform_delay(0.1, 0.4))
+    await asyncio.sleep(human_delay(0.1, 0.4))
 
 
 async def sleep_micro() -> None:
     """Short micro-pause between actions (50-200ms)."""
-    await asyncio.sleep(uniform_delay(0.05, 0.2))
+    await asyncio.sleep(human_delay(0.05, 0.2))
 
 
 async def sleep_page_load() -> None:
@@ -13,6 +13,8 @@ def setup_logging(level: str = "INFO") -> None:
     )
     structlog.configure(
         processors=[
+            # Drop disabled levels before anything is formatted
+            structlog.stdlib.filter_by_level,
             structlog.stdlib.add_log_level,
             structlog.stdlib.add_logger_name,
             structlog.dev.ConsoleRenderer(colors=True),
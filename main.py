@@ -72,7 +72,7 @@ def login(ctx: click.Context, email: str | None, interactive: bool) -> None:
             if await is_logged_in(page):
                 click.echo("✅ Уже авторизованы! Сессия активна.")
                 return
-            await do_login_with_email(page, email)
+            await do_login_with_email(page, email, known_login_state=False)
             click.echo("✅ Авторизация успешна. Сессия сохранена в профиле браузера.")
 
     asyncio.run(_run())
@@ -183,6 +183,8 @@ def run(
         from hh_bot.browser.launcher import launch_browser
         from hh_bot.bot.state import StateDB
         from hh_bot.bot.runner import run_session
+        from hh_bot.ai_generator.cache import close_letter_cache
+        from hh_bot.ai_generator.client import aclose_client
 
         db = StateDB()
         try:
@@ -206,9 +208,11 @@ def run(
                 click.echo(f"  ❌ Ошибки:       {stats.errors}")
                 if stats.skip_reasons:
                     click.echo("  Причины пропуска:")
-                    for reason, count in sorted(stats.skip_reasons.items(), key=lambda x: -x[1]):
+                    for reason, count in stats.skip_reasons.most_common():
                         click.echo(f"    • {reason}: {count}")
         finally:
+            await aclose_client()
+            close_letter_cache()
             db.close()
 
     asyncio.run(_run())
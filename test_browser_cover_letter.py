@@ -16,6 +16,7 @@ from hh_bot.utils.config import load_config
 from hh_bot.scraper.resume_parser import ResumeInfo, fetch_resume_content
 from hh_bot.scraper.vacancy import fetch_vacancy_details
 from hh_bot.scraper.apply import apply_to_vacancy
+from hh_bot.ai_generator.client import aclose_client
 from hh_bot.ai_generator.generator import generate_ai_cover_letter
 from hh_bot.ai_generator.models import AIGeneratorConfig
 from hh_bot.utils.logger import get_logger, setup_logging
@@ -151,6 +152,8 @@ async def test_ai_generation(resume, details):
             vacancy=details,
             vacancy_description=details.description,
             config=ai_config,
+            telegram=cfg.auth.telegram,
+            author_name=cfg.auth.name,
         )
         
         if letter:
@@ -308,6 +311,7 @@ async def main():
         finally:
             input("\nНажми Enter для закрытия браузера...")
             await browser.close()
+            await aclose_client()
     
     return 0
 